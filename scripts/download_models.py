@@ -2,6 +2,18 @@
 Download and cache required Hugging Face models to avoid repeated downloads.
 Run this script once on the machine (or from the Streamlit UI) to prefetch models.
 """
+import importlib.util
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# Use the Rust multi-connection downloader when available. huggingface_hub reads
+# this flag at import time and errors if hf_transfer is missing, hence the check.
+if importlib.util.find_spec('hf_transfer') is not None:
+    os.environ.setdefault('HF_HUB_ENABLE_HF_TRANSFER', '1')
 
 MODEL_NAMES = {
     "clause_detection": {
@@ -16,39 +28,65 @@ MODEL_NAMES = {
 }
 
 
+# Files needed by from_pretrained for tokenizers and weights (vocab.txt for BERT,
+# spiece.model for Pegasus); everything else in the repos is skipped.
+ALLOW_PATTERNS = ['*.json', '*.txt', '*.model', '*.safetensors', '*.bin', 'tokenizer*', 'spiece*']
+
+
+def _fetch_one(key, cfg):
+    from huggingface_hub import snapshot_download
+    from huggingface_hub.utils import LocalEntryNotFoundError
+
+    model_name = cfg['model']
+    result = {"model": model_name}
+    try:
+        # populate the HF cache without instantiating the model; skip the
+        # revision check against the Hub when the snapshot is already cached
+        try:
+            snapshot_download(repo_id=model_name, allow_patterns=ALLOW_PATTERNS, local_files_only=True)
+        except (LocalEntryNotFoundError, OSError):
+            snapshot_download(repo_id=model_name, allow_patterns=ALLOW_PATTERNS)
+        result['tokenizer'] = 'ok'
+        result['model_files'] = 'ok'
+    except Exception as e:
+        result['tokenizer'] = f'error: {e}'
+        result['model_files'] = f'error: {e}'
+    return key, result
+
+
 def download_all_models():
     results = {}
     try:
-        from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModelForSeq2SeqLM
+        import huggingface_hub  # noqa: F401
     except Exception as e:
-        return {"error": f"transformers not installed: {e}"}
+        return {"error": f"huggingface_hub not installed: {e}"}
 
-    for key, cfg in MODEL_NAMES.items():
-        model_name = cfg['model']
-        results[key] = {"model": model_name}
-        try:
-            # download tokenizer
-            AutoTokenizer.from_pretrained(model_name, local_files_only=False)
-            results[key]['tokenizer'] = 'ok'
-        except Exception as e:
-            results[key]['tokenizer'] = f'error: {e}'
-            continue
-
-        try:
-            if cfg['type'] == 'classification':
-                AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=cfg.get('num_labels', 2))
-            else:
-                AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            results[key]['model_files'] = 'ok'
-        except Exception as e:
-            results[key]['model_files'] = f'error: {e}'
+    # Downloads are I/O bound, so fetch every model concurrently.
+    with ThreadPoolExecutor(max_workers=len(MODEL_NAMES)) as executor:
+        for key, result in executor.map(lambda item: _fetch_one(*item), MODEL_NAMES.items()):
+            results[key] = result
 
     return results
 
 
+def export_onnx_models():
+    """Export the simplifier for ONNX Runtime so CPU servers never export on a request"""
+    if importlib.util.find_spec('optimum') is None or importlib.util.find_spec('onnxruntime') is None:
+        return {"simplifier_onnx": "skipped: optimum[onnxruntime] not installed"}
+    sys.path.insert(0, str(SRC_DIR))
+    from components.module5_language_simplification import DEFAULT_SIMPLIFIER_MODEL, HF_TOKEN, export_onnx_simplifier
+
+    try:
+        onnx_dir = export_onnx_simplifier(DEFAULT_SIMPLIFIER_MODEL, token=HF_TOKEN)
+        return {"simplifier_onnx": f"ok: {onnx_dir}"}
+    except Exception as e:
+        return {"simplifier_onnx": f"error: {e}"}
+
+
 if __name__ == '__main__':
     print('Prefetching models... this may take several minutes and use several GB of disk.')
     res = download_all_models()
+    res.update(export_onnx_models())
     print('Results:')
     for k, v in res.items():
         print(k, v)
@@ -1,18 +1,16 @@
 """Blueprint routes for the ClauseEase admin dashboard."""
 from __future__ import annotations
 
-import base64
+import logging
+import threading
+import time
 from datetime import datetime, timedelta, date
-from io import BytesIO
-from typing import Dict, List
-
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-from flask import Blueprint, abort, render_template
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from flask import Blueprint, abort, jsonify, render_template
 from flask_login import current_user, login_required
-from sqlalchemy import func
+from sqlalchemy import Integer, bindparam, case, cast, desc, func, select
 
 admin_bp = Blueprint('admin_portal', __name__)
 
@@ -20,6 +18,19 @@ _User = None
 _Document = None
 _get_db = None
 
+# Dashboard statements, built once the models are injected by configure_admin
+_STATEMENTS: Dict[str, Any] = {}
+
+# Trend results keyed by (today, newest row id); only the latest entry is kept
+_REG_CACHE: Dict[Tuple[date, Any], Dict[str, int]] = {}
+_DOC_CACHE: Dict[Tuple[date, Any], Dict[str, int]] = {}
+
+# Chart series precomputed off the request path by start_dashboard_refresher
+_DASHBOARD_REFRESH_SECONDS = 300
+_trend_snapshot: Optional[Dict[str, Dict[str, list]]] = None
+_refresher_lock = threading.Lock()
+_refresher_started = False
+
 
 def configure_admin(get_db_callable, user_model, document_model) -> None:
     """Inject dependencies from the main application."""
@@ -27,164 +38,252 @@ def configure_admin(get_db_callable, user_model, document_model) -> None:
     _get_db = get_db_callable
     _User = user_model
     _Document = document_model
+    _STATEMENTS.update(_build_statements())
+
+
+def _build_statements() -> Dict[str, Any]:
+    """Build the dashboard SELECTs once so requests only bind parameters."""
+    active_today = (
+        select(func.count(func.distinct(_Document.user_id)))
+        .where(
+            _Document.uploaded_at >= bindparam('day_start'),
+            _Document.uploaded_at < bindparam('day_end'),
+        )
+        .scalar_subquery()
+    )
+    totals = select(
+        select(func.count(_User.id)).scalar_subquery(),
+        select(func.count(_Document.id)).scalar_subquery(),
+        active_today,
+    )
+
+    registrations = (
+        select(func.date(_User.created_at), func.count(_User.id))
+        .where(_User.created_at >= bindparam('start'))
+        .group_by(func.date(_User.created_at))
+    )
 
+    week_bucket = cast(
+        (func.julianday(_Document.uploaded_at) - func.julianday(bindparam('epoch'))) / 7,
+        Integer,
+    ).label('week_bucket')
+    documents_weekly = (
+        select(week_bucket, func.count(_Document.id))
+        .where(_Document.uploaded_at >= bindparam('start'))
+        .group_by(week_bucket)
+    )
+
+    # Correlated count per user (served by the documents.user_id index) instead of
+    # joining every document; the activity bucket is only computed for the top 5.
+    doc_count = (
+        select(func.count(_Document.id))
+        .where(_Document.user_id == _User.id)
+        .correlate(_User)
+        .scalar_subquery()
+    )
+    ranked = (
+        select(_User.username, doc_count.label('doc_count'))
+        .order_by(desc('doc_count'))
+        .limit(5)
+        .subquery()
+    )
+    top_users = select(
+        ranked.c.username,
+        ranked.c.doc_count,
+        case(
+            (ranked.c.doc_count >= 4, 'High'),
+            (ranked.c.doc_count >= 2, 'Medium'),
+            else_='Low',
+        ).label('activity_level'),
+    ).order_by(ranked.c.doc_count.desc())
 
-def _encode_plot(fig: plt.Figure) -> str:
-    """Convert a Matplotlib figure to a base64 data URI."""
-    buffer = BytesIO()
-    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=120)
-    buffer.seek(0)
-    image_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close(fig)
-    return f"data:image/png;base64,{image_b64}"
+    return {
+        'max_user_id': select(func.max(_User.id)),
+        'max_document_id': select(func.max(_Document.id)),
+        'totals': totals,
+        'registrations': registrations,
+        'documents_weekly': documents_weekly,
+        'top_users': top_users,
+    }
 
 
 def _registrations_last_week(db_session) -> Dict[str, int]:
     """Return registration counts keyed by ISO date string for the last 7 days."""
+    global _REG_CACHE
     today = date.today()
-    start_date = today - timedelta(days=6)
+    key = (today, db_session.execute(_STATEMENTS['max_user_id']).scalar())
+    # Single lookup; the refresher thread may swap the cache between two steps
+    cached = _REG_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-    rows = (
-        db_session.query(func.date(_User.created_at), func.count(_User.id))
-        .filter(_User.created_at >= datetime.combine(start_date, datetime.min.time()))
-        .group_by(func.date(_User.created_at))
-        .all()
-    )
+    start_date = today - timedelta(days=6)
+    rows = db_session.execute(
+        _STATEMENTS['registrations'],
+        {'start': datetime.combine(start_date, datetime.min.time())},
+    ).all()
 
     counts = {str(day): total for day, total in rows}
-    result: Dict[str, int] = {}
-    for offset in range(7):
-        current = start_date + timedelta(days=offset)
-        key = current.isoformat()
-        result[key] = counts.get(key, 0)
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(today, 'D') + 1)
+    result = {day: counts.get(day, 0) for day in np.datetime_as_string(days, unit='D').tolist()}
+    _REG_CACHE = {key: result}
     return result
 
 
 def _documents_last_weeks(db_session) -> Dict[str, int]:
     """Return document counts keyed by week label for the last 4 calendar weeks."""
+    global _DOC_CACHE
     today = date.today()
+    key = (today, db_session.execute(_STATEMENTS['max_document_id']).scalar())
+    cached = _DOC_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     current_week_start = today - timedelta(days=today.weekday())
     four_weeks_ago_start = current_week_start - timedelta(weeks=3)
 
-    rows = (
-        db_session.query(func.strftime('%Y-%W', _Document.uploaded_at), func.count(_Document.id))
-        .filter(_Document.uploaded_at >= datetime.combine(four_weeks_ago_start, datetime.min.time()))
-        .group_by(func.strftime('%Y-%W', _Document.uploaded_at))
-        .all()
-    )
+    rows = db_session.execute(
+        _STATEMENTS['documents_weekly'],
+        {
+            'start': datetime.combine(four_weeks_ago_start, datetime.min.time()),
+            'epoch': four_weeks_ago_start.isoformat(),
+        },
+    ).all()
 
-    counts = {week: total for week, total in rows}
+    counts = {bucket: total for bucket, total in rows}
 
-    result: Dict[str, int] = {}
-    for weeks_back in reversed(range(4)):
-        week_start = current_week_start - timedelta(weeks=weeks_back)
-        week_end = week_start + timedelta(days=6)
-        week_key = week_start.strftime('%Y-%W')
-        label = f"{week_start.strftime('%d %b')} - {week_end.strftime('%d %b')}"
-        result[label] = counts.get(week_key, 0)
+    week_starts = np.datetime64(four_weeks_ago_start, 'D') + np.arange(4) * 7
+    week_ends = week_starts + 6
+    result = {
+        f"{start.strftime('%d %b')} - {end.strftime('%d %b')}": counts.get(bucket, 0)
+        for bucket, (start, end) in enumerate(zip(week_starts.tolist(), week_ends.tolist()))
+    }
+    _DOC_CACHE = {key: result}
     return result
 
 
-def _build_line_chart(labels: List[str], values: List[int], title: str) -> str:
-    sns.set_theme(style='whitegrid')
-    fig, ax = plt.subplots(figsize=(7, 3.6))
-    sns.lineplot(x=labels, y=values, marker='o', linewidth=2, color='#2563EB', ax=ax)
-    ax.set_xlabel('')
-    ax.set_ylabel('Count', fontweight='bold')
-    ax.set_ylim(bottom=0)
-    for tick in ax.get_xticklabels():
-        tick.set_rotation(25)
-    fig.tight_layout()
-    return _encode_plot(fig)
-
-
-def _build_bar_chart(labels: List[str], values: List[int], title: str) -> str:
-    sns.set_theme(style='whitegrid')
-    fig, ax = plt.subplots(figsize=(7, 3.6))
-    palette = sns.color_palette('Blues', len(values))
-    sns.barplot(x=labels, y=values, palette=palette, ax=ax)
-    ax.set_xlabel('')
-    ax.set_ylabel('Count', fontweight='bold')
-    ax.set_ylim(bottom=0)
-    for index, value in enumerate(values):
-        ax.text(index, value + 0.05, str(value), ha='center', va='bottom', fontweight='bold')
-    for tick in ax.get_xticklabels():
-        tick.set_rotation(15)
-    fig.tight_layout()
-    return _encode_plot(fig)
+def _dashboard_totals(db_session, today: date) -> Tuple[int, int, int]:
+    """Return total users, total documents and today's active users in one query."""
+    row = db_session.execute(
+        _STATEMENTS['totals'],
+        {
+            'day_start': datetime.combine(today, datetime.min.time()),
+            'day_end': datetime.combine(today + timedelta(days=1), datetime.min.time()),
+        },
+    ).one()
+    return row[0] or 0, row[1] or 0, row[2] or 0
 
 
-@admin_bp.route('/admin')
-@login_required
-def admin_dashboard():
-    if not all((_get_db, _User, _Document)):
-        abort(500)
-    if current_user.username.lower() != 'admin':
-        abort(403)
+def _dashboard_trends(db_session) -> Dict[str, Dict[str, list]]:
+    """Return labels and values for the registration and document trend charts."""
+    registration_trend = _registrations_last_week(db_session)
+    registration_days = np.array(list(registration_trend), dtype='datetime64[D]')
+    documents_trend = _documents_last_weeks(db_session)
+    return {
+        'registrations': {
+            'labels': [day.strftime('%d %b') for day in registration_days.tolist()],
+            'values': list(registration_trend.values()),
+        },
+        'documents': {
+            'labels': list(documents_trend.keys()),
+            'values': list(documents_trend.values()),
+        },
+    }
 
+
+def _refresh_trend_snapshot() -> Dict[str, Dict[str, list]]:
+    global _trend_snapshot
     with _get_db() as db:
-        total_users = db.query(_User).count()
-        total_documents = db.query(_Document).count()
-        today = datetime.now().date()
-        active_users_today = (
-            db.query(func.count(func.distinct(_Document.user_id)))
-            .filter(func.date(_Document.uploaded_at) == today.isoformat())
-            .scalar() or 0
-        )
+        _trend_snapshot = _dashboard_trends(db)
+    return _trend_snapshot
 
-        registration_trend = _registrations_last_week(db)
-        registration_labels = [
-            datetime.fromisoformat(key).strftime('%d %b') for key in registration_trend.keys()
-        ]
-        registration_values = list(registration_trend.values())
-        registrations_chart = _build_line_chart(
-            registration_labels,
-            registration_values,
-            'User Registrations Per Day (Last 7 Days)'
-        )
 
-        documents_trend = _documents_last_weeks(db)
-        documents_labels = list(documents_trend.keys())
-        documents_values = list(documents_trend.values())
-        documents_chart = _build_bar_chart(
-            documents_labels,
-            documents_values,
-            'Documents Processed Per Week (Last 4 Weeks)'
-        )
+def _dashboard_refresh_loop(interval_seconds: int) -> None:
+    while True:
+        try:
+            _refresh_trend_snapshot()
+        except Exception:
+            logging.exception('Admin dashboard refresh failed')
+        time.sleep(interval_seconds)
 
-        active_users_rows = (
-            db.query(_User.username, func.count(_Document.id).label('doc_count'))
-            .outerjoin(_Document, _Document.user_id == _User.id)
-            .group_by(_User.id)
-            .order_by(func.count(_Document.id).desc())
-            .limit(5)
-            .all()
-        )
 
-    active_users_data = []
-    for username, doc_count in active_users_rows:
-        if doc_count >= 4:
-            level = 'High'
-        elif doc_count >= 2:
-            level = 'Medium'
-        else:
-            level = 'Low'
-        active_users_data.append({
-            'username': username,
-            'documents': doc_count,
-            'activity_level': level
-        })
+def start_dashboard_refresher(interval_seconds: int = _DASHBOARD_REFRESH_SECONDS) -> None:
+    """Recompute the dashboard chart series in a daemon thread every interval, once per process."""
+    global _refresher_started
+    with _refresher_lock:
+        if _refresher_started:
+            return
+        _refresher_started = True
+    threading.Thread(
+        target=_dashboard_refresh_loop,
+        args=(interval_seconds,),
+        name='admin-dashboard-refresh',
+        daemon=True,
+    ).start()
 
-    context = {
+
+def _dashboard_data(db_session) -> Dict[str, Any]:
+    """Collect the live totals and most active users plus the precomputed chart series."""
+    today = datetime.now().date()
+    total_users, total_documents, active_users_today = _dashboard_totals(db_session, today)
+
+    trends = _trend_snapshot or _refresh_trend_snapshot()
+    active_users_rows = db_session.execute(_STATEMENTS['top_users']).all()
+
+    return {
         'total_users': total_users,
         'total_documents': total_documents,
         'active_users_today': active_users_today,
-        'registrations_chart': registrations_chart,
-        'documents_chart': documents_chart,
-        'active_users_data': active_users_data,
-        'registration_labels': registration_labels,
-        'documents_labels': documents_labels,
+        'registrations': trends['registrations'],
+        'documents': trends['documents'],
+        'active_users': [
+            {'username': username, 'documents': documents, 'activity_level': level}
+            for username, documents, level in active_users_rows
+        ],
+    }
+
+
+def _require_admin() -> None:
+    if not all((_get_db, _User, _Document)):
+        abort(500)
+    if current_user.username.lower() != 'admin':
+        abort(403)
+    # Started by the first admin request, so importing app.py starts no threads
+    start_dashboard_refresher()
+
+
+@admin_bp.route('/admin')
+@login_required
+def admin_dashboard():
+    _require_admin()
+
+    with _get_db() as db:
+        data = _dashboard_data(db)
+
+    context = {
+        'total_users': data['total_users'],
+        'total_documents': data['total_documents'],
+        'active_users_today': data['active_users_today'],
+        'chart_data': {
+            'registrations': data['registrations'],
+            'documents': data['documents'],
+        },
+        'active_users_data': data['active_users'],
+        'registration_labels': data['registrations']['labels'],
+        'documents_labels': data['documents']['labels'],
         'generated_at': datetime.utcnow(),
     }
 
     return render_template('admin.html', **context)
+
+
+@admin_bp.route('/admin/data')
+@login_required
+def admin_dashboard_data():
+    """Return the dashboard figures as JSON for client-side rendering."""
+    _require_admin()
+
+    with _get_db() as db:
+        data = _dashboard_data(db)
+
+    return jsonify(data)
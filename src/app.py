@@ -2,33 +2,44 @@ import os
 import json
 import logging
 import traceback
+import threading
+import time
 import io
-import base64
+from concurrent.futures import ThreadPoolExecutor
 import re
 from pathlib import Path
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 import pytz
 from contextlib import contextmanager
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _HAS_ARGON2 = True
+except Exception:
+    _HAS_ARGON2 = False
 from werkzeug.utils import secure_filename
 import fitz
 from docx import Document as DocxDocument
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
 
-from flask import Flask, request, jsonify, session, make_response, render_template, redirect, url_for, flash, send_file
+from flask import Flask, request, jsonify, session, make_response, render_template, redirect, url_for, flash, send_file, abort
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Email, EqualTo, Length
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey, or_
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, or_
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session, load_only, deferred
 
-from nltk.tokenize import sent_tokenize, word_tokenize
-import syllables
+try:
+    from PIL import Image
+    _HAS_PIL = True
+except Exception:
+    _HAS_PIL = False
 
 # Project paths
 ROOT = Path(__file__).parent.parent
@@ -44,19 +55,45 @@ if str(CURRENT_DIR) not in sys.path:
     sys.path.insert(0, str(CURRENT_DIR))
 
 # Import custom modules
-from components.module1_document_ingestion import extract_text
-from components.module2_text_preprocessing import clean_text, preprocess_contract_text
-from components.module3_clause_detection import detect_clause_type, ensure_model_loaded
+from components.module1_document_ingestion import extract_text, extract_text_bytes
+from components.module2_text_preprocessing import (
+    clean_text,
+    preprocess_contract_text,
+    split_sentences_fast,
+)
+from components.module3_clause_detection import detect_clause_types_batch, ensure_model_loaded
 from components.module4_legal_terms import extract_legal_terms
-from components.module5_language_simplification import simplify_text
-from components.readability_metrics import calculate_all_metrics
+from components.module5_language_simplification import simplify_texts
+from components.readability_metrics import TextStats, calculate_all_metrics
 
 # Database configuration
 DB_PATH = ROOT / 'data' / 'clauseease.db'
 DB_PATH.parent.mkdir(exist_ok=True)
 
-engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={'check_same_thread': False}, future=True)
+engine = create_engine(
+    f'sqlite:///{DB_PATH}',
+    connect_args={'check_same_thread': False, 'timeout': 30},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    future=True,
+)
 SessionLocal = scoped_session(sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True))
+
+
+@event.listens_for(engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL with NORMAL sync avoids an fsync per commit under concurrent uploads."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-64000')
+    cursor.close()
+
+
 Base = declarative_base()
 
 # User model
@@ -77,7 +114,7 @@ class Document(Base):
     __tablename__ = 'documents'
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     document_title = Column(String(255), nullable=False)
     original_text = Column(Text, nullable=False)
     simplified_text_basic = Column(Text)
@@ -85,13 +122,29 @@ class Document(Base):
     simplified_text_advanced = Column(Text)
     original_readability_score = Column(Float)
     uploaded_at = Column(DateTime, default=lambda: datetime.now(pytz.timezone('Asia/Kolkata')))
-    report_json = Column(Text)
+    # Large blob, loaded only by the views that list it in load_only
+    report_json = deferred(Column(Text))
     stats_json = Column(Text)
     clause_count = Column(Integer, default=0)
     word_count = Column(Integer, default=0)
+    original_sentence_count = Column(Integer)
+    simplified_sentence_count = Column(Integer)
+    simplified_word_count = Column(Integer)
+    simplified_readability_score = Column(Float)
 
     user = relationship('User', back_populates='documents')
 
+    __table_args__ = (
+        Index('ix_documents_uploaded_at_user_id', 'uploaded_at', 'user_id'),
+        # Covers the history lists: user filter, uploaded_at ordering (scanned backwards
+        # for DESC) and every projected scalar, so SQLite never visits the table rows
+        Index(
+            'ix_documents_history_cov',
+            'user_id', 'uploaded_at', 'document_title', 'clause_count',
+            'word_count', 'original_readability_score', 'simplified_word_count',
+        ),
+    )
+
 # Glossary model
 class Glossary(Base):
     __tablename__ = 'glossary'
@@ -129,22 +182,32 @@ def get_db():
 
 def init_db():
     Base.metadata.create_all(bind=engine)
-
-def count_syllables(word):
-    return syllables.estimate(word)
+    with engine.begin() as conn:
+        # The covering index leads with user_id and (user_id, uploaded_at), so these are redundant
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_documents_user_id')
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_documents_user_uploaded')
+        # create_all does not add new columns to an existing table either
+        existing = {row[1] for row in conn.exec_driver_sql('PRAGMA table_info(documents)')}
+        for column in Document.__table__.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE documents ADD COLUMN {column.name} {column_type}')
+    # create_all skips indexes on tables that already exist; columns must exist first
+    for index in Document.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 def calculate_reading_ease(text):
-    if not text or not text.strip():
+    stats = text if isinstance(text, TextStats) else TextStats.from_text(text)
+    if not stats.text.strip():
         return 0.0
 
     try:
-        sentences = sent_tokenize(text)
-        words = [word for word in word_tokenize(text) if word.isalpha()]
+        sentences, words = stats.sentences, stats.words
 
         if len(sentences) == 0 or len(words) == 0:
             return 0.0
 
-        syllable_count = sum(count_syllables(word) for word in words)
+        syllable_count = stats.syllable_count
         words_per_sentence = len(words) / max(len(sentences), 1)
         syllables_per_word = syllable_count / max(len(words), 1)
         score = 206.835 - (1.015 * words_per_sentence) - (84.6 * syllables_per_word)
@@ -152,23 +215,57 @@ def calculate_reading_ease(text):
     except Exception:
         return 0.0
 
-# Generate base64 charts
-def generate_chart_base64(chart_type, data, title):
-    """Create chart as base64"""
-    plt.figure(figsize=(10, 7))
-    plt.style.use('seaborn-v0_8-whitegrid')
+# Render result charts; matplotlib is imported on the first render, not at startup
+PIE_COLORS = ['#3b82f6', '#f59e0b', '#10b981', '#8b5cf6', '#ef4444', '#06b6d4', '#ec4899', '#14b8a6']
+
+# One reusable figure, canvas and output buffer per worker thread
+_chart_local = threading.local()
+_matplotlib_lock = threading.Lock()
+_MATPLOTLIB_READY = False
+
+def _load_matplotlib():
+    """Select the Agg backend and chart style once per process"""
+    global _MATPLOTLIB_READY
+    with _matplotlib_lock:
+        if not _MATPLOTLIB_READY:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.style
+            matplotlib.style.use('seaborn-v0_8-whitegrid')
+            _MATPLOTLIB_READY = True
+
+def _chart_canvas():
+    canvas = getattr(_chart_local, 'canvas', None)
+    if canvas is None:
+        _load_matplotlib()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(10, 7), dpi=120, facecolor='white', edgecolor='none')
+        canvas = _chart_local.canvas = FigureCanvasAgg(figure)
+        _chart_local.buffer = io.BytesIO()
+    return canvas
+
+# WebP encodes faster than libpng and is 30-50% smaller; PNG stays available for old clients
+CHART_FORMATS = {'webp': 'image/webp', 'png': 'image/png'}
+CHART_WEBP_QUALITY = 80
+
+def render_chart_image(chart_type, data, title, fmt='webp'):
+    """Render a chart to WebP (default) or PNG bytes"""
+    canvas = _chart_canvas()
+    fig = canvas.figure
+    fig.clear()
+    ax = fig.add_subplot(111)
     
     if chart_type == 'pie':
         labels = list(data.keys())
         sizes = list(data.values())
-        colors = ['#3b82f6', '#f59e0b', '#10b981', '#8b5cf6', '#ef4444', '#06b6d4', '#ec4899', '#14b8a6']
         
         # Simple 2D design
-        wedges, texts, autotexts = plt.pie(
+        wedges, texts, autotexts = ax.pie(
             sizes, 
             labels=labels, 
             autopct='%1.1f%%', 
-            colors=colors[:len(labels)],
+            colors=PIE_COLORS[:len(labels)],
             startangle=90,
             textprops={'fontsize': 12, 'weight': 'bold', 'color': '#1e293b'}
         )
@@ -179,8 +276,8 @@ def generate_chart_base64(chart_type, data, title):
             autotext.set_fontsize(13)
             autotext.set_weight('bold')
         
-        plt.title(title, fontsize=16, fontweight='bold', color='#1e293b', pad=25)
-        plt.axis('equal')
+        ax.set_title(title, fontsize=16, fontweight='bold', color='#1e293b', pad=25)
+        ax.axis('equal')
         
     elif chart_type == 'bar':
         categories = list(data.keys())
@@ -190,8 +287,6 @@ def generate_chart_base64(chart_type, data, title):
         x = range(len(categories))
         width = 0.38
         
-        fig, ax = plt.subplots(figsize=(10, 7))
-        
         # Create comparison bars
         bars1 = ax.bar([i - width/2 for i in x], original_values, width, 
                        label='Original', color='#3b82f6', edgecolor='#1e40af', linewidth=2)
@@ -215,16 +310,30 @@ def generate_chart_base64(chart_type, data, title):
         ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.5)
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
-        
-        plt.tight_layout()
     
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=120, bbox_inches='tight', facecolor='white', edgecolor='none')
+    # Pre-sized figure with a single layout pass instead of bbox_inches='tight'
+    fig.tight_layout()
+    buffer = _chart_local.buffer
     buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    return f"data:image/png;base64,{image_base64}"
+    buffer.truncate()
+    if fmt == 'webp' and _HAS_PIL:
+        canvas.draw()
+        image = Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+        image.save(buffer, format='WEBP', quality=CHART_WEBP_QUALITY, method=4)
+    else:
+        canvas.print_png(buffer)
+    return buffer.getvalue()
+
+CHART_KINDS = {
+    'clause_types': ('pie', 'Clause Types Distribution'),
+    'stats': ('bar', 'Text Statistics Comparison'),
+}
+
+@lru_cache(maxsize=128)
+def _chart_image(kind, data_json, fmt):
+    """Render a stored chart once per distinct data set and format"""
+    chart_type, title = CHART_KINDS[kind]
+    return render_chart_image(chart_type, json.loads(data_json), title, fmt)
 
 # Flask app configuration
 app = Flask(__name__, 
@@ -235,6 +344,10 @@ app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
 app.config['WTF_CSRF_ENABLED'] = True
 app.config['WTF_CSRF_TIME_LIMIT'] = None  # No expiration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
+IN_MEMORY_UPLOAD_LIMIT = 8 * 1024 * 1024  # larger uploads spill to UPLOAD_FOLDER
+
+# Independent pipeline stages of one upload overlap here; model inference releases the GIL
+_pipeline_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='clauseease-pipeline')
 
 # Setup Flask-Login
 login_manager = LoginManager()
@@ -242,18 +355,45 @@ login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
 
-@login_manager.user_loader
-def load_user(user_id):
-    """Load user by ID"""
+# Immutable user snapshots, reused across requests for a short TTL
+USER_CACHE_TTL = 60
+
+@dataclass(frozen=True)
+class UserView(UserMixin):
+    """Read-only copy of a User row, safe to share between request threads"""
+    id: int
+    username: str
+    email: str
+    created_at: Optional[datetime]
+
+# Per-user login version, bumped on logout or password change
+_login_versions = {}
+_login_versions_lock = threading.Lock()
+
+@lru_cache(maxsize=1024)
+def _load_user_view(user_id, login_version, ttl_bucket):
+    # A new login version or ttl_bucket stops old entries matching; LRU evicts them
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.id == int(user_id)).first()
-        if user:
-            db.expunge(user)  # Detach from session
-        return user
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        return UserView(id=user.id, username=user.username, email=user.email, created_at=user.created_at)
     finally:
         db.close()
 
+def invalidate_cached_user(user_id):
+    """Retire only this user's cached view; other users keep their entries"""
+    user_id = int(user_id)
+    with _login_versions_lock:
+        _login_versions[user_id] = _login_versions.get(user_id, 0) + 1
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Load user by ID"""
+    user_id = int(user_id)
+    return _load_user_view(user_id, _login_versions.get(user_id, 0), int(time.monotonic() // USER_CACHE_TTL))
+
 # Routes
 @app.route('/')
 def index():
@@ -270,6 +410,34 @@ def dashboard():
     return render_template('landing.html')
 
 # Auth blueprint setup
+# Password hashing: argon2id when available, Werkzeug pbkdf2 otherwise.
+# Existing pbkdf2 hashes still verify and are upgraded on the next login.
+if _HAS_ARGON2:
+    _password_hasher = PasswordHasher(memory_cost=64 * 1024, parallelism=2)
+
+def hash_user_password(password):
+    if _HAS_ARGON2:
+        return _password_hasher.hash(password)
+    return generate_password_hash(password)
+
+def verify_user_password(password_hash, password):
+    if _HAS_ARGON2 and password_hash.startswith('$argon2'):
+        try:
+            return _password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    if not _HAS_ARGON2:
+        return False
+    if not password_hash.startswith('$argon2'):
+        return True
+    return _password_hasher.check_needs_rehash(password_hash)
+
+# Verified against when the email is unknown so misses take as long as hits
+_DUMMY_PASSWORD_HASH = hash_user_password('clauseease-dummy-password')
+
 from flask import Blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -284,7 +452,13 @@ def login():
         with get_db() as db:
             # Find user by email
             user = db.query(User).filter(User.email == form.email.data).first()
-            if user and check_password_hash(user.password_hash, form.password.data):
+            if user is None:
+                verify_user_password(_DUMMY_PASSWORD_HASH, form.password.data)
+            elif verify_user_password(user.password_hash, form.password.data):
+                if password_needs_rehash(user.password_hash):
+                    user.password_hash = hash_user_password(form.password.data)
+                    db.commit()
+                    invalidate_cached_user(user.id)
                 login_user(user)
                 next_page = request.args.get('next')
                 return redirect(next_page) if next_page else redirect(url_for('dashboard'))
@@ -316,7 +490,7 @@ def register():
             user = User(
                 username=form.username.data,
                 email=form.email.data,
-                password_hash=generate_password_hash(form.password.data)
+                password_hash=hash_user_password(form.password.data)
             )
             db.add(user)
             db.commit()
@@ -330,6 +504,7 @@ def register():
 @login_required
 def logout():
     """User logout route"""
+    invalidate_cached_user(current_user.id)
     logout_user()
     return redirect(url_for('auth.login'))
 
@@ -361,26 +536,38 @@ def process_document():
         if simplification_level not in ['basic', 'intermediate', 'advanced']:
             simplification_level = 'basic'
 
-        # Save temp file
-        file_path = UPLOAD_FOLDER / filename
-        file.save(str(file_path))
-
-        # Extract document text
-        raw_text = extract_text(str(file_path))
+        # Extract document text in memory; only large uploads go through a temp file
+        if (request.content_length or 0) > IN_MEMORY_UPLOAD_LIMIT:
+            file_path = UPLOAD_FOLDER / filename
+            file.save(str(file_path))
+            try:
+                raw_text = extract_text(str(file_path))
+            finally:
+                file_path.unlink(missing_ok=True)
+        else:
+            raw_text = extract_text_bytes(file.read(), Path(filename).suffix)
         if not raw_text or not raw_text.strip():
             flash('Could not extract text from the file')
             return redirect(url_for('dashboard'))
 
-        # Clean and preprocess
+        # Whole-document term extraction overlaps with the clause work
         processed_text = clean_text(raw_text)
+        terms_future = _pipeline_pool.submit(extract_legal_terms, processed_text)
         processed_clauses = preprocess_contract_text(raw_text)
         
-        # Process each clause
+        # Classify all clauses in one batched call; the document and its clauses share
+        # a single simplifier call, since the model must not run on two threads at once
+        clause_texts = [clause_data['cleaned_text'] for clause_data in processed_clauses]
+        labels_future = _pipeline_pool.submit(detect_clause_types_batch, clause_texts)
+        simplified_future = _pipeline_pool.submit(simplify_texts, [processed_text] + clause_texts, level=simplification_level)
+        
+        # Tokenize each text once and share the counts across every metric
+        original_stats = TextStats.from_text(raw_text)
+        clause_labels = labels_future.result()
+        simplified_text, *simplified_clauses = simplified_future.result()
+        
         clauses = []
-        for idx, clause_data in enumerate(processed_clauses):
-            clause_type = detect_clause_type(clause_data['cleaned_text'])
-            simplified = simplify_text(clause_data['cleaned_text'], level=simplification_level)
-            
+        for idx, (clause_data, clause_type, simplified) in enumerate(zip(processed_clauses, clause_labels, simplified_clauses)):
             clauses.append({
                 'index': idx + 1,
                 'raw_text': clause_data['raw_text'],
@@ -391,54 +578,57 @@ def process_document():
                 'simplified': simplified
             })
         
-        # Extract legal terms
-        legal_terms = extract_legal_terms(processed_text)
-        simplified_text = simplify_text(processed_text, level=simplification_level)
+        legal_terms = terms_future.result()
+        
+        has_simplified = bool(simplified_text and simplified_text.strip())
+        simplified_stats = TextStats.from_text(simplified_text)
         
         # Calculate readability metrics
-        original_metrics = calculate_all_metrics(raw_text)
-        simplified_metrics = calculate_all_metrics(simplified_text)
+        original_metrics = calculate_all_metrics(original_stats)
+        simplified_metrics = calculate_all_metrics(simplified_stats)
         
-        # Generate clause chart
+        # Clause chart data, rendered on demand by document_chart
         clause_types = Counter([c['type'] for c in clauses])
-        clause_chart = generate_chart_base64('pie', clause_types, 'Clause Types Distribution')
         
         # Calculate text statistics
-        original_words = len(raw_text.split())
-        simplified_words = len(simplified_text.split()) if simplified_text and simplified_text.strip() else int(original_words * 0.7)
-        
-        from nltk.tokenize import sent_tokenize
-        original_sentences = len(sent_tokenize(raw_text))
-        simplified_sentences = len(sent_tokenize(simplified_text)) if simplified_text and simplified_text.strip() else int(original_sentences * 0.7)
+        original_words, original_complex = original_stats.token_count, original_stats.long_word_count
+        original_sentences = len(original_stats.sentences)
+        if has_simplified:
+            simplified_words, simplified_complex = simplified_stats.token_count, simplified_stats.long_word_count
+            simplified_sentences = len(simplified_stats.sentences)
+        else:
+            simplified_words, simplified_complex = int(original_words * 0.7), 0
+            simplified_sentences = int(original_sentences * 0.7)
         
         stats_data = {
             'Word Count': [original_words, simplified_words],
             'Sentence Count': [original_sentences, simplified_sentences],
             'Avg Words/Sentence': [round(original_words / max(original_sentences, 1), 1), 
                                    round(simplified_words / max(simplified_sentences, 1), 1)],
-            'Complex Words': [sum(1 for word in raw_text.split() if len(word) > 8),
-                            sum(1 for word in simplified_text.split() if len(word) > 8) if simplified_text and simplified_text.strip() else 0]
+            'Complex Words': [original_complex, simplified_complex]
         }
-        stats_chart = generate_chart_base64('bar', stats_data, 'Text Statistics Comparison')
         
-        # Highlight legal terms
+        # Highlight legal terms in a single pass over the text
         highlighted_text = raw_text
-        if legal_terms:
-            for term in legal_terms:
-                if isinstance(term, dict) and 'term' in term:
-                    term_word = term['term']
-                    term_definition = term.get('simplified_explanation', term.get('definition', 'Legal term'))
-                    
-                    # Escape HTML quotes
-                    term_definition = term_definition.replace('"', '&quot;').replace("'", '&#39;')
-                    
-                    # Preserve original case
-                    def replace_func(match):
-                        return f'<span class="highlight-legal" title="{term_definition}">{match.group(0)}</span>'
-                    
-                    # Apply highlighting
-                    pattern = re.compile(r'\b' + re.escape(term_word) + r'\b', re.IGNORECASE)
-                    highlighted_text = pattern.sub(replace_func, highlighted_text)
+        definitions = {}
+        for term in legal_terms or []:
+            if isinstance(term, dict) and 'term' in term:
+                term_definition = term.get('simplified_explanation', term.get('definition', 'Legal term'))
+                # Escape HTML quotes
+                term_definition = term_definition.replace('"', '&quot;').replace("'", '&#39;')
+                definitions.setdefault(term['term'].lower(), term_definition)
+        
+        if definitions:
+            # Longest terms first so multi-word terms win over their prefixes
+            alternation = '|'.join(re.escape(term) for term in sorted(definitions, key=len, reverse=True))
+            pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+            
+            # Preserve original case
+            def replace_func(match):
+                term_definition = definitions.get(match.group(0).lower(), 'Legal term')
+                return f'<span class="highlight-legal" title="{term_definition}">{match.group(0)}</span>'
+            
+            highlighted_text = pattern.sub(replace_func, raw_text)
         
         # Package results
         results = {
@@ -447,8 +637,7 @@ def process_document():
             'simplified_text': simplified_text,
             'original_metrics': original_metrics,
             'simplified_metrics': simplified_metrics,
-            'clause_type_chart': clause_chart,
-            'stats_chart': stats_chart,
+            'chart_data': {'clause_types': dict(clause_types), 'stats': stats_data},
             'highlighted_text': highlighted_text,
             'simplification_level': simplification_level,
             'original_sentences': original_sentences,
@@ -470,20 +659,20 @@ def process_document():
                 document_title=filename,
                 original_text=raw_text,
                 **level_fields,
-                original_readability_score=calculate_reading_ease(raw_text),
+                original_readability_score=calculate_reading_ease(original_stats),
                 report_json=json.dumps(results),
                 clause_count=len(clauses),
-                word_count=len(raw_text.split())
+                word_count=original_words,
+                original_sentence_count=original_sentences,
+                simplified_sentence_count=simplified_sentences,
+                simplified_word_count=simplified_words,
+                simplified_readability_score=calculate_reading_ease(simplified_stats)
             )
             db.add(document)
             db.commit()
             db.refresh(document)
             document_id = document.id
             
-        # Remove temp file
-        if file_path.exists():
-            file_path.unlink()
-        
         return redirect(url_for('view_document', document_id=document_id))
 
     except Exception as e:
@@ -496,8 +685,19 @@ def process_document():
 def view_document(document_id):
     """Display single document results"""
     with get_db() as db:
-        # Query user's document
-        document = db.query(Document).filter(
+        # Query user's document; the simplified text columns stay deferred
+        document = db.query(Document).options(load_only(
+            Document.id,
+            Document.document_title,
+            Document.uploaded_at,
+            Document.clause_count,
+            Document.word_count,
+            Document.original_readability_score,
+            Document.original_sentence_count,
+            Document.simplified_sentence_count,
+            Document.original_text,
+            Document.report_json
+        )).filter(
             Document.id == document_id,
             Document.user_id == current_user.id
         ).first()
@@ -509,15 +709,22 @@ def view_document(document_id):
         # Load report JSON
         results = json.loads(document.report_json) if document.report_json else {}
         
+        # Only fetch the stored basic text when the report has no simplified text
+        simplified_text_basic = None if results.get('simplified_text') else document.simplified_text_basic
+        
+        # Sentence counts come from their columns; older rows fall back to the report
+        if document.original_sentence_count is not None:
+            results['original_sentences'] = document.original_sentence_count
+        if document.simplified_sentence_count is not None:
+            results['simplified_sentences'] = document.simplified_sentence_count
+        
         if 'original_sentences' not in results and document.original_text:
-            from nltk.tokenize import sent_tokenize
-            results['original_sentences'] = len(sent_tokenize(document.original_text))
+            results['original_sentences'] = len(split_sentences_fast(document.original_text))
         
         if 'simplified_sentences' not in results:
-            simplified_text = results.get('simplified_text') or document.simplified_text_basic
+            simplified_text = results.get('simplified_text') or simplified_text_basic
             if simplified_text:
-                from nltk.tokenize import sent_tokenize
-                results['simplified_sentences'] = len(sent_tokenize(simplified_text))
+                results['simplified_sentences'] = len(split_sentences_fast(simplified_text))
             else:
                 results['simplified_sentences'] = 0
         
@@ -525,7 +732,7 @@ def view_document(document_id):
             'id': document.id,
             'document_title': document.document_title,
             'original_text': document.original_text,
-            'simplified_text_basic': document.simplified_text_basic,
+            'simplified_text_basic': simplified_text_basic,
             'original_readability_score': document.original_readability_score,
             'uploaded_at': document.uploaded_at,
             'clause_count': document.clause_count,
@@ -534,25 +741,59 @@ def view_document(document_id):
         
     return render_template('results.html', document=doc_data, results=results)
 
+@app.route('/chart/<int:document_id>/<kind>')
+@login_required
+def document_chart(document_id, kind):
+    """Serve a result chart as WebP, or PNG with ?format=png or for clients without WebP"""
+    if kind not in CHART_KINDS:
+        abort(404)
+    fmt = request.args.get('format')
+    if fmt not in CHART_FORMATS:
+        webp_ok = _HAS_PIL and request.accept_mimetypes['image/webp'] > 0
+        fmt = 'webp' if webp_ok else 'png'
+    elif fmt == 'webp' and not _HAS_PIL:
+        fmt = 'png'
+
+    
+    with get_db() as db:
+        document = db.query(Document).filter(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        ).first()
+        if not document:
+            abort(404)
+        results = json.loads(document.report_json) if document.report_json else {}
+    
+    data = results.get('chart_data', {}).get(kind)
+    if not data:
+        abort(404)
+    
+    image = _chart_image(kind, json.dumps(data), fmt)
+    response = send_file(io.BytesIO(image), mimetype=CHART_FORMATS[fmt])
+    # Reports never change once stored
+    response.headers['Cache-Control'] = 'private, max-age=86400, immutable'
+    response.headers['Vary'] = 'Accept'
+    return response
+
 @app.route('/history')
 @login_required
 def history():
     """Show user document history"""
     with get_db() as db:
-        # Get all user documents
-        documents = db.query(Document).filter(
+        # Get all user documents as plain rows, without hydrating ORM objects
+        rows = db.query(
+            Document.id,
+            Document.document_title,
+            Document.uploaded_at,
+            Document.clause_count,
+            Document.word_count,
+            Document.original_readability_score
+        ).filter(
             Document.user_id == current_user.id
         ).order_by(Document.uploaded_at.desc()).all()
         
         # Convert to dict
-        docs_data = [{
-            'id': doc.id,
-            'document_title': doc.document_title,
-            'uploaded_at': doc.uploaded_at,
-            'clause_count': doc.clause_count,
-            'word_count': doc.word_count,
-            'original_readability_score': doc.original_readability_score
-        } for doc in documents]
+        docs_data = [row._asdict() for row in rows]
         
     return render_template('history.html', documents=docs_data)
 
@@ -562,7 +803,14 @@ def download_report(document_id):
     """Export document report JSON"""
     with get_db() as db:
         # Query user's document
-        document = db.query(Document).filter(
+        document = db.query(Document).options(load_only(
+            Document.document_title,
+            Document.uploaded_at,
+            Document.original_text,
+            Document.simplified_text_basic,
+            Document.original_readability_score,
+            Document.report_json
+        )).filter(
             Document.id == document_id,
             Document.user_id == current_user.id
         ).first()
@@ -1,27 +1,34 @@
+import io
 import os
+
 import fitz  # PyMuPDF
 from docx import Document
 
+
+def _open_pdf(source):
+    """Open a PDF from a file path or from in-memory bytes"""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
 def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF"""
-    text = ""
+    """Extract text from PDF (path or bytes)"""
     try:
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text.strip()
+        # Single process: a per-request pool would fork the threaded server and cost more than it saves
+        with _open_pdf(pdf_path) as doc:
+            return "".join(page.get_text("text") for page in doc).strip()
     except Exception as e:
         return f"[ERROR] Could not extract PDF: {str(e)}"
 
 def extract_text_from_docx(docx_path):
-    """Extract text from DOCX"""
-    text = ""
+    """Extract text from DOCX (path or bytes)"""
     try:
+        if isinstance(docx_path, (bytes, bytearray)):
+            docx_path = io.BytesIO(docx_path)
         doc = Document(docx_path)
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text += para.text.strip() + "\n"
-        return text.strip()
+        paragraphs = (para.text.strip() for para in doc.paragraphs)
+        return "\n".join(text for text in paragraphs if text)
     except Exception as e:
         return f"[ERROR] Could not extract DOCX: {str(e)}"
 
@@ -39,6 +46,16 @@ def extract_text(file_path):
     else:
         return "[ERROR] Unsupported file type. Only PDF and DOCX are supported."
 
+def extract_text_bytes(data, ext):
+    """Extract text from an in-memory upload, dispatching on its extension"""
+    ext = ext.lower()
+    if ext == '.pdf':
+        return extract_text_from_pdf(data)
+    elif ext == '.docx':
+        return extract_text_from_docx(data)
+    else:
+        return "[ERROR] Unsupported file type. Only PDF and DOCX are supported."
+
 if __name__ == "__main__":
     contract_file = "Contract document.pdf"
     extracted = extract_text(contract_file)
@@ -1,45 +1,169 @@
 import re
-import nltk
-try:
-    import spacy
-except Exception:
-    spacy = None
+from functools import lru_cache
+from importlib.util import find_spec
 
-from nltk.tokenize import sent_tokenize
+# NLTK, spaCy and their data are imported and loaded on first use, not at import
+_HAS_SPACY = find_spec("spacy") is not None
+_nltk = None
+_punkt = None
+_NLTK_READY = False
+_NLP_LOADED = False
+nlp = None
 
-# Download NLTK data
-nltk.download('punkt')
-nltk.download('punkt_tab')
 
-# Load spaCy model
-nlp = None
-if spacy is not None:
+def _get_nltk():
+    """Import NLTK on first use"""
+    global _nltk
+    if _nltk is None:
+        import nltk
+        import nltk.tokenize
+        _nltk = nltk
+    return _nltk
+
+
+def _ensure_nltk():
+    """Download the punkt tokenizers only if they are not installed yet"""
+    global _NLTK_READY
+    nltk = _get_nltk()
+    if _NLTK_READY:
+        return nltk
+    for resource, package in (('tokenizers/punkt', 'punkt'), ('tokenizers/punkt_tab', 'punkt_tab')):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, quiet=True)
+    _NLTK_READY = True
+    return nltk
+
+
+def _get_punkt():
+    """Punkt sentence tokenizer, built once per process and reused on every call"""
+    global _punkt
+    if _punkt is None:
+        nltk = _ensure_nltk()
+        try:
+            # NLTK >= 3.8.2 would otherwise construct a new PunktTokenizer per sent_tokenize call
+            from nltk.tokenize import PunktTokenizer
+            _punkt = PunktTokenizer("english")
+        except ImportError:
+            _punkt = nltk.data.load("tokenizers/punkt/english.pickle")
+    return _punkt
+
+
+def _get_nlp():
+    """Load the spaCy model on first use; None when spaCy is unavailable"""
+    global nlp, _NLP_LOADED
+    if _NLP_LOADED or not _HAS_SPACY:
+        return nlp
+    _NLP_LOADED = True
     try:
+        import spacy
         nlp = spacy.load("en_core_web_sm")
         print("spaCy model 'en_core_web_sm' loaded successfully for entity extraction")
     except Exception as e:
         print(f"Could not load spaCy model: {e}")
         print("Run: python -m spacy download en_core_web_sm")
         nlp = None
+    return nlp
+
+
+# Punkt results are cached: preprocess_clause splits every clause when spaCy is unavailable,
+# and contracts repeat boilerplate clauses
+
+@lru_cache(maxsize=512)
+def _sent_tokenize_cached(text: str) -> tuple:
+    return tuple(_get_punkt().tokenize(text))
+
+
+def sent_tokenize(text: str) -> list:
+    """Split text into sentences, reusing results for repeated texts"""
+    return list(_sent_tokenize_cached(text))
 
 
 # Text cleaning functions
 
+# Regex splitters for the metrics/simplification hot paths; set the flag to use spaCy's
+# blank-English sentencizer instead (sentences fall back to NLTK Punkt without spaCy)
+USE_PRECISE_TOKENIZERS = False
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_ALPHA_WORD_RE = re.compile(r'[A-Za-z]+')
+_sentencizer = None
+
+
+def _get_sentencizer():
+    """Blank English pipeline with only the rule-based sentencizer; no model download"""
+    global _sentencizer
+    if _sentencizer is None and _HAS_SPACY:
+        import spacy
+        sentencizer = spacy.blank("en")
+        sentencizer.add_pipe("sentencizer")
+        _sentencizer = sentencizer
+    return _sentencizer
+
+
+@lru_cache(maxsize=32)
+def _sentencizer_doc(text: str):
+    # TextStats asks for sentences and words of the same text back to back
+    return _get_sentencizer()(text)
+
+
+def split_sentences_fast(text: str) -> list:
+    """Split text into sentences at terminal punctuation followed by whitespace"""
+    if USE_PRECISE_TOKENIZERS:
+        if _get_sentencizer() is not None:
+            return [sent.text for sent in _sentencizer_doc(text.strip()).sents if sent.text.strip()]
+        return sent_tokenize(text)
+    return [sent for sent in _SENT_SPLIT_RE.split(text.strip()) if sent]
+
+
+def alpha_words(text: str) -> list:
+    """Return the alphabetic word tokens of text"""
+    if USE_PRECISE_TOKENIZERS:
+        if _get_sentencizer() is not None:
+            return [token.text for token in _sentencizer_doc(text.strip()) if token.is_alpha]
+    return _ALPHA_WORD_RE.findall(text)
+
+
+# Smart quotes and non-breaking spaces, normalized in one translate pass
+_QUOTE_TABLE = str.maketrans({
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '\xa0': ' ',
+})
+_CTRL_RE = re.compile(r'[\r\f\v]')
+_WS_RE = re.compile(r'\s+')
+
+
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
-    text = text.replace('\xa0', ' ')
-    text = re.sub(r'[\r\f\v]', '', text)
-    text = re.sub(r'\s+', ' ', text)  # Collapse spaces
-    # Normalize smart quotes
-    quote_map = {
-        '"': '"',
-        '"': '"',
-        ''': "'",
-        ''': "'",
-    }
-    for src, replacement in quote_map.items():
-        text = text.replace(src, replacement)
-    return text.strip()
+    return _WS_RE.sub(' ', _CTRL_RE.sub('', text.translate(_QUOTE_TABLE))).strip()
+
+
+# Clause markers, compiled once into a single alternation
+_MARKERS = [
+    ('ANNEXURE', r'Annexure-?\s*'),
+    ('HEADING', r'AGREEMENT FORMAT'),
+    ('SUBHEADING', r'\(ON NON-JUDICIAL'),
+    ('PREAMBLE', r'This\s+agreement\s+is\s+made'),
+    ('AND_SEPARATOR', r'\bAND\s*\n'),
+    ('WHEREAS', r'Whereas\s+the\s+Employer'),
+    ('WITNESSETH', r'NOW THIS AGREEMENT WITNESSETH'),
+    ('NUMBERED_CLAUSE', r'\n\s*\d+\.\s+[A-Z]'),
+    ('IN_WITNESS', r'In witness whereof'),
+    ('SEAL', r'The Common Seal'),
+    ('SIGNED', r'Signed Sealed and Delivered'),
+    ('EMPLOYER_SIG', r'For & on behalf of Employer'),
+    ('CONTRACTOR_SIG', r'For & on behalf of Contractor'),
+    ('NOTE', r'\bNote:'),
+]
+_MARKER_RE = re.compile(
+    '|'.join(f'(?P<{label}>{pattern})' for label, pattern in _MARKERS),
+    re.IGNORECASE | re.MULTILINE,
+)
+_CRLF_RE = re.compile(r'\r\n?')
+_MULTI_NL_RE = re.compile(r'\n+')
 
 
 def segment_clauses(text: str) -> list:
@@ -48,35 +172,11 @@ def segment_clauses(text: str) -> list:
         return [text]
     
     # Normalize line breaks
-    text = re.sub(r'\r\n?', '\n', text)
-    text = re.sub(r'\n+', '\n', text)
-    
-    # Define clause markers
-    markers = [
-        (r'(Annexure-?\s*)', 'ANNEXURE'),
-        (r'(AGREEMENT FORMAT)', 'HEADING'),
-        (r'(\(ON NON-JUDICIAL)', 'SUBHEADING'),
-        (r'(This\s+agreement\s+is\s+made)', 'PREAMBLE'),
-        (r'(\bAND\s*\n)', 'AND_SEPARATOR'),
-        (r'(Whereas\s+the\s+Employer)', 'WHEREAS'),
-        (r'(NOW THIS AGREEMENT WITNESSETH)', 'WITNESSETH'),
-        (r'(\n\s*\d+\.\s+[A-Z])', 'NUMBERED_CLAUSE'),
-        (r'(In witness whereof)', 'IN_WITNESS'),
-        (r'(The Common Seal)', 'SEAL'),
-        (r'(Signed Sealed and Delivered)', 'SIGNED'),
-        (r'(For & on behalf of Employer)', 'EMPLOYER_SIG'),
-        (r'(For & on behalf of Contractor)', 'CONTRACTOR_SIG'),
-        (r'(\bNote:)', 'NOTE'),
-    ]
-    
-    # Find all markers
-    splits = []
-    for pattern, label in markers:
-        for match in re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE):
-            splits.append((match.start(), label, match.group(0)))
+    text = _CRLF_RE.sub('\n', text)
+    text = _MULTI_NL_RE.sub('\n', text)
     
-    # Sort by position
-    splits.sort(key=lambda x: x[0])
+    # Find all markers in one pass, already ordered by position
+    splits = [(match.start(), match.lastgroup, match.group(0)) for match in _MARKER_RE.finditer(text)]
     
     if not splits:
         # Fallback to paragraphs
@@ -120,6 +220,7 @@ def split_sentences(text: str) -> list:
 
 def extract_entities(text: str) -> list:
     """Extract named entities"""
+    nlp = _get_nlp()
     if nlp is None:
         return []  # spaCy unavailable
     
@@ -152,10 +253,25 @@ def preprocess_contract_text(raw_text: str) -> list:
     """Preprocess entire contract"""
     cleaned_text = clean_text(raw_text)
     clauses = segment_clauses(cleaned_text)
-    
+    nlp = _get_nlp()
+    if nlp is None:
+        return [preprocess_clause(clause) for clause in clauses]
+
+    # One spaCy pass over all clauses; NER and sentences only need the parser and ner
+    cleaned_clauses = [clean_text(clause) for clause in clauses]
+    try:
+        docs = list(nlp.pipe(cleaned_clauses, batch_size=32, disable=["lemmatizer", "tagger"]))
+    except Exception as e:
+        print(f"Error extracting entities: {e}")
+        return [preprocess_clause(clause) for clause in clauses]
+
     processed = []
-    for clause in clauses:
-        result = preprocess_clause(clause)
-        processed.append(result)
-    
-    return processed
\ No newline at end of file
+    for clause, cleaned, doc in zip(clauses, cleaned_clauses, docs):
+        processed.append({
+            "raw_text": clause,
+            "cleaned_text": cleaned,
+            "sentences": [sent.text for sent in doc.sents],
+            "entities": [(ent.text, ent.label_) for ent in doc.ents]
+        })
+
+    return processed
@@ -1,4 +1,5 @@
 import re
+from importlib.util import find_spec
 
 # Legal term categories mapping
 _LEXICON = {
@@ -91,49 +92,128 @@ _DEFINITIONS = {
     "state": "A political territory with its own government and laws",
 }
 
-# Load spaCy model
+_DEFAULT_DEFINITION = "Legal terminology used in contracts."
+_DEFAULT_TERM_INFO = ("Legal Term", _DEFAULT_DEFINITION)
+
+# Lowercase term -> (category, definition), so each match costs a single lookup
+_TERM_INFO = {term.lower(): ("Legal Term", definition) for term, definition in _DEFINITIONS.items()}
+_TERM_INFO.update(
+    (keyword.lower(), (category, _DEFINITIONS.get(keyword, _DEFAULT_DEFINITION)))
+    for keyword, category in _LEXICON.items()
+)
+
+# Quoted terms and "X means / shall mean / refers to" definitions, fused into one pattern
+_QUOTED_PATTERN = r'["\'](?P<quoted>[A-Z][A-Za-z\s]{2,30})["\']'
+_DEFINITION_PATTERN = r'(?P<defined>[A-Z][A-Za-z\s]{2,30})\s*(?:\(hereinafter|shall mean|means|refers to)'
+_TERM_RE = re.compile(f'{_QUOTED_PATTERN}|{_DEFINITION_PATTERN}')
+
 try:
-    import spacy
-    _HAS_SPACY = True
+    import ahocorasick
+    _HAS_AHOCORASICK = True
+except Exception:
+    _HAS_AHOCORASICK = False
+
+# All lexicon keywords, found in one pass over the text
+_LEXICON_AUTOMATON = None
+if _HAS_AHOCORASICK:
+    _LEXICON_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _LEXICON:
+        _LEXICON_AUTOMATON.add_word(_keyword, _keyword)
+    _LEXICON_AUTOMATON.make_automaton()
+
+# NER runs on at most this many sentences that contain a capitalized word
+NER_MAX_SENTENCES = 20
+_SENT_RE = re.compile(r'[^.!?\s][^.!?]*[.!?]*')
+_CAP_RE = re.compile(r'\b[A-Z][a-z]+')
+
+# spaCy and its model are loaded on the first extraction, not at import
+_HAS_SPACY = find_spec("spacy") is not None
+_SPACY_NLP = None
+_SPACY_LOADED = False
+
+
+def _get_spacy_nlp():
+    """Load the spaCy model on first use; None when spaCy or the model is unavailable"""
+    global _SPACY_NLP, _SPACY_LOADED
+    if _SPACY_LOADED or not _HAS_SPACY:
+        return _SPACY_NLP
+    _SPACY_LOADED = True
     try:
-        _SPACY_NLP = spacy.load("en_core_web_sm")
+        import spacy
+        # Only ent.label_ is used, so keep tok2vec + ner and skip the rest of the pipeline
+        _SPACY_NLP = spacy.load("en_core_web_sm", disable=["tagger", "parser", "lemmatizer", "attribute_ruler"])
     except Exception:
         _SPACY_NLP = None
-except Exception:
-    _HAS_SPACY = False
-    _SPACY_NLP = None
+    return _SPACY_NLP
 
 
 def extract_legal_terms(text: str):
     """Extract and define legal terms"""
-    if not text or not text.strip():
-        return []
+    return extract_legal_terms_batch([text])[0]
+
+
+def _ner_candidates(text):
+    """Offsets and text of the first sentences that contain a capitalized word"""
+    candidates = []
+    for match in _SENT_RE.finditer(text):
+        if _CAP_RE.search(match.group()):
+            candidates.append((match.start(), match.group()))
+            if len(candidates) == NER_MAX_SENTENCES:
+                break
+    return candidates
+
+
+def extract_legal_terms_batch(texts):
+    """Extract legal terms for several texts, running spaCy NER over them in one pipe"""
+    entities = [[] for _ in texts]
+    spacy_nlp = _get_spacy_nlp()
+    if spacy_nlp:
+        # Only whole sentences likely to name an entity are parsed, never a mid-sentence slice
+        owners, sentences = [], []
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                for offset, sentence in _ner_candidates(text):
+                    owners.append((i, offset))
+                    sentences.append(sentence)
+        try:
+            for (i, offset), doc in zip(owners, spacy_nlp.pipe(sentences, batch_size=8)):
+                entities[i].extend(
+                    (ent.text, ent.label_, offset + ent.start_char, offset + ent.end_char)
+                    for ent in doc.ents
+                    if ent.label_ in ['LAW', 'ORG', 'EVENT']
+                )
+        except Exception:
+            entities = [[] for _ in texts]  # Silent fail
+    
+    return [
+        _collect_terms(text, ents) if text and text.strip() else []
+        for text, ents in zip(texts, entities)
+    ]
 
+
+def _collect_terms(text, entities):
     found = []
     seen = set()  # Prevent duplicates
     
-    # Extract quoted terms
-    quoted_pattern = r'["\']([A-Z][A-Za-z\s]{2,30})["\']'
-    for match in re.finditer(quoted_pattern, text):
-        term = match.group(1).strip()
-        term_lower = term.lower()
-        if term_lower not in seen:
-            definition = _DEFINITIONS.get(term_lower, "Legal terminology used in contracts.")
-            found.append({
-                "term": term,
-                "category": "Defined Term",
-                "definition": definition,
-                "simplified_explanation": definition
-            })
-            seen.add(term_lower)
+    # Lowercase the text once; when lowering keeps every offset, matches are sliced from it
+    text_lower = text.lower()
+    same_offsets = len(text_lower) == len(text)
     
-    # Extract definition patterns
-    definition_pattern = r'([A-Z][A-Za-z\s]{2,30})\s*(?:\(hereinafter|shall mean|means|refers to)'
-    for match in re.finditer(definition_pattern, text):
-        term = match.group(1).strip()
-        term_lower = term.lower()
+    def lowered(start, end):
+        return text_lower[start:end] if same_offsets else text[start:end].lower()
+    
+    # One scan collects quoted and "X means ..." definitions; quoted terms are added first
+    quoted_terms, defined_terms = [], []
+    for match in _TERM_RE.finditer(text):
+        group = match.lastgroup
+        start, end = match.span(group)
+        (quoted_terms if group == 'quoted' else defined_terms).append(
+            (match.group(group).strip(), lowered(start, end).strip())
+        )
+    
+    for term, term_lower in quoted_terms + defined_terms:
         if term_lower not in seen:
-            definition = _DEFINITIONS.get(term_lower, "Legal terminology used in contracts.")
+            definition = _TERM_INFO.get(term_lower, _DEFAULT_TERM_INFO)[1]
             found.append({
                 "term": term,
                 "category": "Defined Term",
@@ -143,11 +223,14 @@ def extract_legal_terms(text: str):
             seen.add(term_lower)
     
     # Check lexicon keywords
-    t = text.lower()
-    for keyword, category in _LEXICON.items():
-        if keyword in t:
+    if _LEXICON_AUTOMATON is not None:
+        present = {keyword for _, keyword in _LEXICON_AUTOMATON.iter(text_lower)}
+    else:
+        present = {keyword for keyword in _LEXICON if keyword in text_lower}
+    for keyword in _LEXICON:
+        if keyword in present:
             if keyword not in seen:
-                definition = _DEFINITIONS.get(keyword, "Legal terminology used in contracts.")
+                category, definition = _TERM_INFO[keyword]
                 found.append({
                     "term": keyword.title(),
                     "category": category,
@@ -156,34 +239,28 @@ def extract_legal_terms(text: str):
                 })
                 seen.add(keyword)
     
-    # Use spaCy NER
-    if _SPACY_NLP:
-        try:
-            doc = _SPACY_NLP(text[:5000])  # Performance limit
-            for ent in doc.ents:
-                if ent.label_ in ['LAW', 'ORG', 'EVENT']:
-                    ent_text = ent.text.strip()
-                    
-                    # Skip quotes
-                    if '"' in ent_text or "'" in ent_text:
-                        continue
-                    
-                    # Skip repeated words
-                    words = ent_text.lower().split()
-                    if len(words) != len(set(words)):
-                        continue
-                    
-                    ent_text_lower = ent_text.lower()
-                    if ent_text_lower not in seen:
-                        definition = _DEFINITIONS.get(ent_text_lower, "Legal terminology used in contracts.")
-                        found.append({
-                            "term": ent_text,
-                            "category": f"{ent.label_} Entity",
-                            "definition": definition,
-                            "simplified_explanation": definition
-                        })
-                        seen.add(ent_text_lower)
-        except Exception:
-            pass  # Silent fail
+    # spaCy NER results
+    for ent_text, label, start, end in entities:
+        ent_text = ent_text.strip()
+        
+        # Skip quotes
+        if '"' in ent_text or "'" in ent_text:
+            continue
+        
+        # Skip repeated words
+        ent_text_lower = lowered(start, end).strip()
+        words = ent_text_lower.split()
+        if len(words) != len(set(words)):
+            continue
+        
+        if ent_text_lower not in seen:
+            definition = _TERM_INFO.get(ent_text_lower, _DEFAULT_TERM_INFO)[1]
+            found.append({
+                "term": ent_text,
+                "category": f"{label} Entity",
+                "definition": definition,
+                "simplified_explanation": definition
+            })
+            seen.add(ent_text_lower)
 
     return found
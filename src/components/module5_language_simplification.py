@@ -1,11 +1,19 @@
+import logging
 import os
+import re
+import threading
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
-try:
-    from transformers import pipeline
-    _HAS_HF = True
-except Exception:
-    _HAS_HF = False
+logger = logging.getLogger(__name__)
+
+# transformers/torch are only imported when the simplifier is first loaded
+_HAS_HF = find_spec("transformers") is not None and find_spec("torch") is not None
+_HAS_ORT = _HAS_HF and find_spec("optimum") is not None and find_spec("onnxruntime") is not None
+
+# Exported ONNX models are written here once and reloaded on later starts
+ONNX_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / 'models' / 'onnx'
 
 try:
     from dotenv import load_dotenv
@@ -22,25 +30,104 @@ HF_TOKEN = os.environ.get("HUGGINGFACE_HUB_TOKEN")
 
 _simplifier = None
 _load_attempted = False
+# Concurrent first requests wait for one load instead of racing past it
+_load_lock = threading.Lock()
+# HF pipelines and fast tokenizers are not thread-safe; one generate call at a time
+_inference_lock = threading.Lock()
+SIMPLIFIER_BATCH_SIZE = 8
 
+# Distilled default (6 decoder layers); the full BART-large model is opt-in quality mode
+DEFAULT_SIMPLIFIER_MODEL = "sshleifer/distilbart-cnn-6-6"
+QUALITY_SIMPLIFIER_MODEL = "facebook/bart-large-cnn"
 
-def ensure_simplifier_loaded(model_name="facebook/bart-large-cnn"):
-    """Load simplification model"""
-    global _simplifier, _load_attempted
+
+def _onnx_dir(model_name):
+    return ONNX_CACHE_DIR / model_name.replace('/', '--')
+
+
+def export_onnx_simplifier(model_name=DEFAULT_SIMPLIFIER_MODEL, token=None):
+    """Export and graph-optimize the simplifier for ONNX Runtime; slow, run from scripts/download_models.py"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer
+    from optimum.onnxruntime.configuration import OptimizationConfig
+    from transformers import AutoTokenizer
+    
+    onnx_dir = _onnx_dir(model_name)
+    if (onnx_dir / 'config.json').exists():
+        return onnx_dir
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, token=token)
+    try:
+        # Graph fusions (attention, GELU, layer norm) on the exported encoder/decoder
+        optimizer = ORTOptimizer.from_pretrained(model)
+        optimizer.optimize(save_dir=onnx_dir, optimization_config=OptimizationConfig(optimization_level=2))
+    except Exception as e:
+        print(f"ONNX graph optimization skipped: {e}")
+        model.save_pretrained(onnx_dir)
+    AutoTokenizer.from_pretrained(model_name, token=token).save_pretrained(onnx_dir)
+    return onnx_dir
+
+
+def _load_onnx_simplifier(model_name):
+    """Summarization pipeline on ONNX Runtime (CPU) from an existing export; None when not exported"""
+    onnx_dir = _onnx_dir(model_name)
+    if not (onnx_dir / 'config.json').exists():
+        return None
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+    
+    model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, provider="CPUExecutionProvider")
+    tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def ensure_simplifier_loaded(model_name=DEFAULT_SIMPLIFIER_MODEL, quality=False):
+    """Load simplification model; quality=True selects the full BART-large model"""
+    with _load_lock:
+        return _ensure_simplifier_loaded(model_name, quality)
+
+
+def _ensure_simplifier_loaded(model_name, quality):
+    global _simplifier, _load_attempted, SIMPLIFIER_BATCH_SIZE
     
     if _load_attempted:
         return _simplifier is not None
     
     _load_attempted = True
+    if quality:
+        model_name = QUALITY_SIMPLIFIER_MODEL
     
     if not _HAS_HF:
         return False
     try:
+        from transformers import pipeline
+        import torch
+        # TF32 tensor cores for any FP32 matmuls left on Ampere+ GPUs
+        torch.set_float32_matmul_precision("high")
+        
         kwargs = {"use_fast": False}
         if HF_TOKEN:
             kwargs["token"] = HF_TOKEN
         print("Using Hugging Face token from environment")
         
+        # CPU hosts run the ONNX graph exported by scripts/download_models.py, if present
+        if _HAS_ORT and not torch.cuda.is_available():
+            try:
+                _simplifier = _load_onnx_simplifier(model_name)
+                if _simplifier is not None:
+                    print(f"Loaded simplification model on ONNX Runtime: {model_name}")
+                    return True
+                print("No ONNX export found, using PyTorch; run scripts/download_models.py to create it")
+            except Exception as e:
+                _simplifier = None
+                print(f"ONNX Runtime load failed, using PyTorch: {e}")
+        
+        # FP16 on GPU uses the tensor cores; CPU stays in FP32
+        if torch.cuda.is_available():
+            kwargs["torch_dtype"] = torch.float16
+            kwargs["device"] = 0
+            SIMPLIFIER_BATCH_SIZE = 16
+        else:
+            kwargs["device"] = -1
+        
         _simplifier = pipeline("summarization", model=model_name, **kwargs)
         print(f"Loaded simplification model: {model_name}")
         return True
@@ -50,7 +137,22 @@ def ensure_simplifier_loaded(model_name="facebook/bart-large-cnn"):
         return False
 
 
-def simplify_text(text: str, max_length=60, level="basic"):
+# Sentences at or under both limits are already plain enough to keep as written
+SIMPLE_MAX_WORDS = 20
+SIMPLE_MAX_SYLLABLES_PER_WORD = 1.6
+
+
+def _is_already_simple(sentence: str) -> bool:
+    """Short sentences of mostly short words skip the model call"""
+    from components.module2_text_preprocessing import alpha_words
+    from components.readability_metrics import count_syllables
+    words = alpha_words(sentence)
+    if not words or len(words) >= SIMPLE_MAX_WORDS:
+        return False
+    return sum(count_syllables(w) for w in words) / len(words) < SIMPLE_MAX_SYLLABLES_PER_WORD
+
+
+def simplify_text(text: str, max_length=60, level="basic", force=False):
     """
     Multi-level text simplification
     
@@ -58,84 +160,158 @@ def simplify_text(text: str, max_length=60, level="basic"):
         text: Input text
         max_length: Maximum output length
         level: Simplification intensity ('basic', 'intermediate', 'advanced')
+        force: Also rewrite sentences that are already simple
     
     Returns:
         Simplified text string
     """
-    global _simplifier, _load_attempted
-    
     if not text or not text.strip():
         return text
+    # Repeated clauses reuse the earlier simplification
+    return _simplify_text_cached(text, max_length, level, force)
+
+
+def simplify_texts(texts, max_length=60, level="basic", force=False):
+    """Simplify several texts, sending all of their sentences through the model in shared batches"""
+    unique = list(dict.fromkeys(t for t in texts if t and t.strip()))
+    simplified = dict(zip(unique, _simplify_batch(tuple(unique), max_length, level, force)))
+    return [simplified.get(t, t) if t else t for t in texts]
+
+
+@lru_cache(maxsize=1024)
+def _simplify_text_cached(text: str, max_length: int, level: str, force: bool) -> str:
+    return _simplify_batch((text,), max_length, level, force)[0]
+
+
+def _simplify_batch(texts: tuple, max_length: int, level: str, force: bool) -> list:
+    global _simplifier, _load_attempted
     
-    # Auto-load model
-    if _HAS_HF and _simplifier is None and not _load_attempted:
-        print("Auto-loading AI simplification model (facebook/bart-large-cnn)...")
-        ensure_simplifier_loaded("facebook/bart-large-cnn")
+    # Auto-load model; returns at once (after any in-flight load) once attempted
+    if _HAS_HF and _simplifier is None:
+        if not _load_attempted:
+            print(f"Auto-loading AI simplification model ({DEFAULT_SIMPLIFIER_MODEL})...")
+        ensure_simplifier_loaded(DEFAULT_SIMPLIFIER_MODEL)
     
-    if _simplifier and len(text.split()) > 10:
-        try:
-            from nltk.tokenize import sent_tokenize
-            sentences = sent_tokenize(text)
-            
-            # Level-specific parameters
-            if level == "basic":
-                temperature = 0.5
-                length_ratio = 0.85
-                max_sentence_length = 30
-            elif level == "intermediate":
-                temperature = 0.7
-                length_ratio = 0.70
-                max_sentence_length = 25
-            else:  # advanced
-                temperature = 1.0
-                length_ratio = 0.55
-                max_sentence_length = 20
-            
-            simplified_sentences = []
-            for sent in sentences:
+    if not _simplifier:
+        return list(texts)
+    
+    try:
+        from components.module2_text_preprocessing import split_sentences_fast
+        
+        # Level-specific parameters
+        if level == "basic":
+            temperature = 0.5
+            length_ratio = 0.85
+            max_sentence_length = 30
+        elif level == "intermediate":
+            temperature = 0.7
+            length_ratio = 0.70
+            max_sentence_length = 25
+        else:  # advanced
+            temperature = 1.0
+            length_ratio = 0.55
+            max_sentence_length = 20
+        
+        # Sentences of every text that share a length budget go through the pipeline as one batch
+        text_sentences = [
+            split_sentences_fast(text) if len(text.split()) > 10 else None
+            for text in texts
+        ]
+        simplified_sentences = [list(sentences) if sentences else None for sentences in text_sentences]
+        buckets = {}
+        for text_idx, sentences in enumerate(text_sentences):
+            for sent_idx, sent in enumerate(sentences or ()):
                 if len(sent.strip()) < 20:
-                    simplified_sentences.append(sent)
                     continue
-                
-                try:
-                    sent_words = len(sent.split())
-                    dynamic_max_length = max(15, min(int(sent_words * length_ratio), 50))
-                    
-                    result = _simplifier(
-                        sent, 
-                        max_length=dynamic_max_length, 
-                        min_length=10,
-                        do_sample=True,
-                        temperature=temperature,
-                        top_p=0.95,
-                        truncation=True
-                    )
-                    
-                    if result and len(result) > 0 and 'summary_text' in result[0]:
-                        ai_output = result[0]['summary_text'].strip()
-                        
-                        if level == "advanced":
-                            ai_output = _aggressive_simplification(ai_output, max_sentence_length)
-                        elif level == "intermediate":
-                            ai_output = _moderate_simplification(ai_output, max_sentence_length)
-                        
-                        if len(ai_output) > 5 and len(ai_output) <= len(sent) * 1.5:
-                            simplified_sentences.append(ai_output)
-                        else:
-                            simplified_sentences.append(sent)
-                    else:
-                        simplified_sentences.append(sent)
-                        
-                except Exception as e:
-                    simplified_sentences.append(sent)
-            
-            return ' '.join(simplified_sentences)
+                if not force and _is_already_simple(sent):
+                    continue
+                sent_words = len(sent.split())
+                dynamic_max_length = max(15, min(int(sent_words * length_ratio), 50))
+                buckets.setdefault(dynamic_max_length, []).append((text_idx, sent_idx))
+        
+        for dynamic_max_length, positions in buckets.items():
+            generate_kwargs = dict(
+                max_length=dynamic_max_length,
+                min_length=10,
+                do_sample=True,
+                temperature=temperature,
+                top_p=0.95,
+                truncation=True,
+            )
+            batch = [text_sentences[t][i] for t, i in positions]
+            try:
+                with _inference_lock:
+                    results = _simplifier(batch, batch_size=SIMPLIFIER_BATCH_SIZE, **generate_kwargs)
+            except Exception:
+                # Retry one sentence at a time so a single bad input only skips itself
+                logger.warning("Batch simplification failed, retrying %d sentences singly", len(batch), exc_info=True)
+                results = []
+                for sent in batch:
+                    try:
+                        with _inference_lock:
+                            results.append(_simplifier(sent, **generate_kwargs))
+                    except Exception:
+                        logger.warning("Sentence simplification failed", exc_info=True)
+                        results.append(None)
             
-        except Exception as e:
-            print(f"[WARN] AI simplification failed: {e}")
-            return text
+            for (text_idx, sent_idx), result in zip(positions, results):
+                if isinstance(result, list):
+                    result = result[0] if result else {}
+                if not result or 'summary_text' not in result:
+                    continue
+                
+                sent = text_sentences[text_idx][sent_idx]
+                ai_output = result['summary_text'].strip()
+                
+                if level == "advanced":
+                    ai_output = _aggressive_simplification(ai_output, max_sentence_length)
+                elif level == "intermediate":
+                    ai_output = _moderate_simplification(ai_output, max_sentence_length)
+                
+                if len(ai_output) > 5 and len(ai_output) <= len(sent) * 1.5:
+                    simplified_sentences[text_idx][sent_idx] = ai_output
+        
+        return [
+            ' '.join(sentences) if sentences is not None else text
+            for text, sentences in zip(texts, simplified_sentences)
+        ]
+        
+    except Exception:
+        logger.warning("AI simplification failed", exc_info=True)
+        return list(texts)
+
+
+_AGGRESSIVE_REPLACEMENTS = {
+    'aforementioned': 'mentioned',
+    'herein': 'here',
+    'thereof': 'of it',
+    'whereby': 'by which',
+    'hereunder': 'under this',
+    'thereto': 'to it',
+    'pursuant to': 'according to',
+    'notwithstanding': 'despite'
+}
+
+_MODERATE_REPLACEMENTS = {
+    'aforementioned': 'mentioned',
+    'herein': 'here',
+    'pursuant to': 'according to'
+}
+
+
+def _compile_replacements(replacements):
+    """Single-pass, case-preserving replacer for a phrase dictionary"""
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in replacements) + r')\b', re.IGNORECASE)
+    
+    def replace(match):
+        new = replacements[match.group(0).lower()]
+        return new.capitalize() if match.group(0)[0].isupper() else new
     
-    return text
+    return lambda text: pattern.sub(replace, text)
+
+
+_replace_aggressive = _compile_replacements(_AGGRESSIVE_REPLACEMENTS)
+_replace_moderate = _compile_replacements(_MODERATE_REPLACEMENTS)
 
 
 def _aggressive_simplification(text: str, max_length: int) -> str:
@@ -145,36 +321,10 @@ def _aggressive_simplification(text: str, max_length: int) -> str:
         if text and text[-1].isalnum():
             text += '.'
 
-    replacements = {
-        'aforementioned': 'mentioned',
-        'herein': 'here',
-        'thereof': 'of it',
-        'whereby': 'by which',
-        'hereunder': 'under this',
-        'thereto': 'to it',
-        'pursuant to': 'according to',
-        'notwithstanding': 'despite'
-    }
-
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-        text = text.replace(old.capitalize(), new.capitalize())
-
-    return text
+    return _replace_aggressive(text)
 
 
 def _moderate_simplification(text: str, max_length: int) -> str:
     """Intermediate post-processing"""
     # Basic term replacement
-    replacements = {
-        'aforementioned': 'mentioned',
-        'herein': 'here',
-        'pursuant to': 'according to'
-    }
-    
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-        text = text.replace(old.capitalize(), new.capitalize())
-    
-    return text
-
+    return _replace_moderate(text)
@@ -1,61 +1,112 @@
 """Text readability metrics calculation"""
 
-from nltk.tokenize import sent_tokenize, word_tokenize
-import matplotlib
-matplotlib.use('Agg')  # Non-GUI backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-import base64
-from io import BytesIO
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import math
+from html import escape
+
+import numpy as np
+import binascii
 from collections import Counter
 
-def count_syllables(word):
-    """Count syllables in word"""
-    word = word.lower()
-    syllables = 0
-    vowels = "aeiouy"
-    
+from components.module2_text_preprocessing import alpha_words, split_sentences_fast
+
+_VOWEL_RUN_RE = re.compile(r'[aeiouy]+')
+
+# Contract vocabulary is small; 100k entries hold it all at a few MB
+@lru_cache(maxsize=100_000)
+def _count_syllables_lower(word):
     if len(word) <= 1:
         return 1
     
     if word.endswith('e'):
         word = word[:-1]
     
-    previous_was_vowel = False
-    for char in word:
-        is_vowel = char in vowels
-        if is_vowel and not previous_was_vowel:
-            syllables += 1
-        previous_was_vowel = is_vowel
+    # Vowel runs are counted by the C regex engine instead of a Python loop
+    return max(1, len(_VOWEL_RUN_RE.findall(word)))
+
+def count_syllables(word):
+    """Count syllables in word"""
+    return _count_syllables_lower(word.lower())
+
+_VOWEL_MASK = np.zeros(256, dtype=bool)
+_VOWEL_MASK[np.frombuffer(b'aeiouy', dtype=np.uint8)] = True
+
+def _syllable_counts(words):
+    """Vowel-group syllable counts for non-empty lowercase words, over one byte array"""
+    encoded = [w.encode('ascii', 'replace') for w in words]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    arr = np.frombuffer(b' '.join(encoded), dtype=np.uint8)
+    
+    vowels = _VOWEL_MASK[arr]
+    starts = vowels.copy()
+    starts[1:] &= ~vowels[:-1]
+    counts = np.add.reduceat(starts.astype(np.int64), offsets)
     
-    return max(1, syllables)
+    # A trailing 'e' that opens its own vowel group is silent
+    last = offsets + lengths - 1
+    counts -= (arr[last] == ord('e')) & starts[last]
+    return np.maximum(counts, 1)
+
+_WORD_RE = re.compile(r'\S+')
+
+
+@dataclass
+class TextStats:
+    """Tokens and counts for one text, computed once and shared by every metric"""
+    text: str
+    sentences: list
+    words: list
+    token_count: int
+    long_word_count: int
+    complex_word_count: int
+    syllable_count: int = 0
+
+    @classmethod
+    def from_text(cls, text):
+        text = text or ""
+        if not text.strip():
+            return cls(text, [], [], 0, 0, 0)
+
+        words = alpha_words(text)
+        # Whitespace tokens back the word-count and long-word statistics
+        lengths = np.fromiter(map(len, _WORD_RE.findall(text)), dtype=np.int32)
+        # One syllable pass serves both the reading-ease and complex-word counts
+        lowered = [w.lower() for w in words]
+        syllables = _syllable_counts(lowered) if lowered else np.zeros(0, dtype=np.int64)
+        word_lengths = np.fromiter(map(len, lowered), dtype=np.int32, count=len(lowered))
+        return cls(
+            text=text,
+            sentences=split_sentences_fast(text),
+            words=words,
+            token_count=len(lengths),
+            long_word_count=int((lengths > 8).sum()),
+            complex_word_count=int(((syllables >= 3) & (word_lengths > 2)).sum()),
+            syllable_count=int(syllables.sum()),
+        )
 
-def count_complex_words(text):
-    """Count 3+ syllable words"""
-    words = word_tokenize(text.lower())
-    complex_words = [w for w in words if len(w) > 2 and count_syllables(w) >= 3]
-    return len(complex_words)
 
 def calculate_all_metrics(text):
-    """Calculate text statistics"""
-    if not text or len(text.strip()) == 0:
-        return {
-            "sentence_count": 0,
-            "word_count": 0,
-            "avg_words_per_sentence": 0,
-            "complex_word_count": 0
-        }
-    
+    """Calculate text statistics from a string or precomputed TextStats"""
     try:
-        sentences = sent_tokenize(text)
-        words = word_tokenize(text)
-        words = [w for w in words if w.isalpha()]
-        
+        stats = text if isinstance(text, TextStats) else TextStats.from_text(text)
+        if not stats.text.strip():
+            return {
+                "sentence_count": 0,
+                "word_count": 0,
+                "avg_words_per_sentence": 0,
+                "complex_word_count": 0
+            }
+
+        sentences, words = stats.sentences, stats.words
         return {
             "sentence_count": len(sentences),
             "word_count": len(words),
             "avg_words_per_sentence": round(len(words) / len(sentences), 2) if len(sentences) > 0 else 0,
-            "complex_word_count": count_complex_words(text)
+            "complex_word_count": stats.complex_word_count
         }
     except Exception as e:
         print(f"Error calculating metrics: {e}")
@@ -67,6 +118,31 @@ def calculate_all_metrics(text):
         }
 
 
+# Charts are emitted as small SVG documents, so no plotting library is loaded
+_PIE_COLORS = [
+    '#3B82F6', '#10B981', '#F59E0B', '#8B5CF6', 
+    '#EC4899', '#0EA5E9', '#FB923C', '#22C55E'
+]
+_SVG_FONT = "font-family='Helvetica, Arial, sans-serif'"
+
+
+def _svg_data_uri(width, height, body):
+    svg = (
+        f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' "
+        f"viewBox='0 0 {width} {height}'><rect width='100%' height='100%' fill='white'/>"
+        f"{''.join(body)}</svg>"
+    )
+    image_base64 = binascii.b2a_base64(svg.encode('utf-8'), newline=False).decode('ascii')
+    return f"data:image/svg+xml;base64,{image_base64}"
+
+
+def _svg_text(x, y, text, size=12, anchor='middle', weight='bold', fill='#1E293B'):
+    return (
+        f"<text x='{x:.1f}' y='{y:.1f}' {_SVG_FONT} font-size='{size}' font-weight='{weight}' "
+        f"text-anchor='{anchor}' fill='{fill}'>{escape(str(text))}</text>"
+    )
+
+
 def generate_clause_type_chart(clause_type_summary):
     """Generate clause pie chart"""
     try:
@@ -74,29 +150,40 @@ def generate_clause_type_chart(clause_type_summary):
             clause_type_summary = {'General': 100}
         
         labels = list(clause_type_summary.keys())
-        sizes = list(clause_type_summary.values())
-        
-        # Chart colors
-        colors = [
-            '#3B82F6', '#10B981', '#F59E0B', '#8B5CF6', 
-            '#EC4899', '#0EA5E9', '#FB923C', '#22C55E'
-        ]
-        
-        fig = plt.figure(figsize=(8, 6))
+        sizes = [float(v) for v in clause_type_summary.values()]
+        total = sum(sizes) or 1.0
         
-        plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, 
-                colors=colors[:len(labels)], textprops={'fontsize': 11, 'weight': 'bold'})
-        plt.title('Clause Types Distribution', fontsize=14, weight='bold', pad=20)
-        plt.axis('equal')
+        width, height = 560, 380
+        cx, cy, r = 190, 205, 140
+        body = [_svg_text(width / 2, 32, 'Clause Types Distribution', size=16)]
         
-        # Convert to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=80, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close(fig)
+        # Slices start at 12 o'clock and run counter-clockwise, like startangle=90
+        angle = math.pi / 2
+        for i, (label, size) in enumerate(zip(labels, sizes)):
+            color = _PIE_COLORS[i % len(_PIE_COLORS)]
+            sweep = 2 * math.pi * size / total
+            if sweep >= 2 * math.pi - 1e-9:
+                body.append(f"<circle cx='{cx}' cy='{cy}' r='{r}' fill='{color}'/>")
+            elif sweep > 0:
+                x1, y1 = cx + r * math.cos(angle), cy - r * math.sin(angle)
+                x2, y2 = cx + r * math.cos(angle + sweep), cy - r * math.sin(angle + sweep)
+                large_arc = 1 if sweep > math.pi else 0
+                body.append(
+                    f"<path d='M {cx} {cy} L {x1:.2f} {y1:.2f} A {r} {r} 0 {large_arc} 0 {x2:.2f} {y2:.2f} Z' "
+                    f"fill='{color}' stroke='white' stroke-width='1.5'/>"
+                )
+            if sweep > 0:
+                mid = angle + sweep / 2
+                body.append(_svg_text(cx + 0.6 * r * math.cos(mid), cy - 0.6 * r * math.sin(mid) + 4,
+                                      f"{100 * size / total:.1f}%", size=11, fill='white'))
+            
+            # Legend
+            ly = 90 + i * 26
+            body.append(f"<rect x='360' y='{ly - 11}' width='14' height='14' rx='2' fill='{color}'/>")
+            body.append(_svg_text(382, ly, label, size=12, anchor='start'))
+            angle += sweep
         
-        return f"data:image/png;base64,{image_base64}"
+        return _svg_data_uri(width, height, body)
     except Exception as e:
         print(f"Error generating clause type chart: {e}")
         return None
@@ -123,38 +210,50 @@ def generate_stats_chart(original_metrics, simplified_metrics):
             simplified_metrics.get('complex_word_count', 0)
         ]
         
-        x = range(len(categories))
-        width = 0.35
+        width, height = 720, 420
+        left, right, top, bottom = 70, 700, 70, 360
+        plot_h = bottom - top
+        y_max = max(original_values + simplified_values + [1]) * 1.1
         
-        fig, ax = plt.subplots(figsize=(10, 6))
+        body = [_svg_text(width / 2, 32, 'Text Statistics Comparison', size=16)]
         
-        # Create side-by-side bars
-        bars1 = ax.bar([i - width/2 for i in x], original_values, width, 
-                        label='Original', color='#2563EB', edgecolor='#1E40AF', linewidth=1.5)
-        bars2 = ax.bar([i + width/2 for i in x], simplified_values, width, 
-                        label='Simplified', color='#A855F7', edgecolor='#7C3AED', linewidth=1.5)
+        # Horizontal grid lines with y tick labels
+        for step in range(6):
+            value = y_max * step / 5
+            y = bottom - plot_h * step / 5
+            body.append(f"<line x1='{left}' y1='{y:.1f}' x2='{right}' y2='{y:.1f}' stroke='#CBD5E1' stroke-dasharray='4 4'/>")
+            body.append(_svg_text(left - 8, y + 4, f"{value:.0f}", size=10, anchor='end', weight='normal'))
+        body.append(f"<line x1='{left}' y1='{bottom}' x2='{right}' y2='{bottom}' stroke='#334155'/>")
+        body.append(f"<line x1='{left}' y1='{top}' x2='{left}' y2='{bottom}' stroke='#334155'/>")
         
-        # Style chart
-        ax.set_xlabel('Metrics', fontsize=12, weight='bold')
-        ax.set_ylabel('Values', fontsize=12, weight='bold')
-        ax.set_title('Text Statistics Comparison', fontsize=14, weight='bold', pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories, fontsize=10)
-        ax.legend(fontsize=11, loc='upper right')
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
+        group_w = (right - left) / len(categories)
+        bar_w = group_w * 0.35
+        for i, category in enumerate(categories):
+            center = left + group_w * (i + 0.5)
+            for offset, value, fill, stroke in (
+                (-bar_w, original_values[i], '#2563EB', '#1E40AF'),
+                (0, simplified_values[i], '#A855F7', '#7C3AED'),
+            ):
+                bar_h = plot_h * value / y_max
+                body.append(
+                    f"<rect x='{center + offset:.1f}' y='{bottom - bar_h:.1f}' width='{bar_w:.1f}' "
+                    f"height='{bar_h:.1f}' fill='{fill}' stroke='{stroke}' stroke-width='1.5'/>"
+                )
+            body.append(_svg_text(center, bottom + 20, category, size=11, weight='normal'))
         
-        plt.tight_layout()
+        body.append(_svg_text((left + right) / 2, bottom + 48, 'Metrics', size=12))
+        body.append(
+            f"<text x='20' y='{(top + bottom) / 2}' {_SVG_FONT} font-size='12' font-weight='bold' "
+            f"text-anchor='middle' fill='#1E293B' transform='rotate(-90 20 {(top + bottom) / 2})'>Values</text>"
+        )
         
-        # Convert to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=80, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close(fig)
+        # Legend
+        for j, (name, fill) in enumerate((('Original', '#2563EB'), ('Simplified', '#A855F7'))):
+            lx = right - 190 + j * 95
+            body.append(f"<rect x='{lx}' y='{top - 22}' width='14' height='14' fill='{fill}'/>")
+            body.append(_svg_text(lx + 20, top - 10, name, size=11, anchor='start', weight='normal'))
         
-        return f"data:image/png;base64,{image_base64}"
+        return _svg_data_uri(width, height, body)
     except Exception as e:
         print(f"Error generating stats chart: {e}")
         return None
@@ -1,21 +1,38 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, request, jsonify, send_file
 from flask_cors import CORS
 import hashlib
+import hmac
 import json
+import logging
 import os
 import sys
+import tempfile
 from pathlib import Path
 import jwt
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from io import BytesIO
-
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey, or_
+from werkzeug.utils import secure_filename
+from werkzeug.security import generate_password_hash, check_password_hash
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _HAS_ARGON2 = True
+except Exception:
+    _HAS_ARGON2 = False
+
+from sqlalchemy import create_engine, event, insert, select, Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, or_
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
 
-from nltk.tokenize import sent_tokenize, word_tokenize
-
 # Add components to path
 CURRENT_DIR = Path(__file__).resolve().parent
 if str(CURRENT_DIR) not in sys.path:
@@ -23,30 +40,69 @@ if str(CURRENT_DIR) not in sys.path:
 
 from components.module1_document_ingestion import extract_text
 from components.module2_text_preprocessing import preprocess_contract_text
-from components.module3_clause_detection import detect_clause_type, ensure_model_loaded
-from components.module5_language_simplification import simplify_text, ensure_simplifier_loaded
+from components.module3_clause_detection import detect_clause_types_batch, ensure_model_loaded
+from components.module5_language_simplification import simplify_texts, ensure_simplifier_loaded
 from components.module4_legal_terms import extract_legal_terms
 from components.readability_metrics import (
+    TextStats,
     calculate_all_metrics,
     generate_clause_type_chart,
     generate_stats_chart,
-    count_syllables,
 )
 
+ROOT = CURRENT_DIR.parent
+UPLOAD_DIR = ROOT / 'temp_uploads'
+UPLOAD_DIR.mkdir(exist_ok=True)
+
+
+class UploadRequest(Request):
+    """Request whose multipart file parts stream straight into UPLOAD_DIR"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Deleted when Werkzeug closes the upload at the end of the request
+        suffix = Path(filename or '').suffix.lower()
+        return tempfile.NamedTemporaryFile('w+b', dir=UPLOAD_DIR, suffix=suffix)
+
+
+# Request logging is lazy %-formatting; set LOG_LEVEL=DEBUG to see per-request detail
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper())
+logger = logging.getLogger(__name__)
+
 # Flask app setup
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app, supports_credentials=True)
 app.config['SECRET_KEY'] = 'clauseease-secret-key-change-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # Paths
-ROOT = CURRENT_DIR.parent
 USERS_FILE = ROOT / 'data' / 'users.json'
 
 DB_PATH = ROOT / 'data' / 'clauseease.db'
 DB_PATH.parent.mkdir(exist_ok=True)
 
-engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={'check_same_thread': False}, future=True)
+engine = create_engine(
+    f'sqlite:///{DB_PATH}',
+    connect_args={'check_same_thread': False, 'timeout': 30},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    future=True,
+)
+
+
+@event.listens_for(engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL with NORMAL sync avoids an fsync per commit on every write endpoint."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+
 SessionLocal = scoped_session(sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True))
 Base = declarative_base()
 
@@ -68,7 +124,7 @@ class Document(Base):
     __tablename__ = 'documents'
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     document_title = Column(String(255), nullable=False)
     original_text = Column(Text, nullable=False)
     simplified_text_basic = Column(Text)
@@ -80,9 +136,22 @@ class Document(Base):
     stats_json = Column(Text)
     clause_count = Column(Integer, default=0)
     word_count = Column(Integer, default=0)
+    simplified_word_count = Column(Integer)
+    content_sha1 = Column(String(40))
 
     user = relationship('User', back_populates='documents')
 
+    __table_args__ = (
+        # Same covering index as app.py; it leads with (user_id, uploaded_at)
+        Index(
+            'ix_documents_history_cov',
+            'user_id', 'uploaded_at', 'document_title', 'clause_count',
+            'word_count', 'original_readability_score', 'simplified_word_count',
+        ),
+        # Re-uploads of the same file by the same user are answered from the stored report
+        Index('ix_documents_user_sha1', 'user_id', 'content_sha1'),
+    )
+
 
 class Glossary(Base):
     __tablename__ = 'glossary'
@@ -115,7 +184,13 @@ def migrate_legacy_users():
     except Exception:
         return
 
-    with get_db() as db:
+    # One read of the existing accounts and one executemany INSERT in a single transaction
+    with engine.begin() as conn:
+        existing = conn.execute(select(User.email, User.username)).all()
+        taken_emails = {email for email, _ in existing}
+        taken_usernames = {username for _, username in existing}
+
+        rows = []
         for email, payload in legacy_users.items():
             username = payload.get('username')
             password_hash = payload.get('password')
@@ -124,8 +199,7 @@ def migrate_legacy_users():
             if not email or not username or not password_hash:
                 continue
 
-            exists = db.query(User).filter(or_(User.email == email, User.username == username)).first()
-            if exists:
+            if email in taken_emails or username in taken_usernames:
                 continue
 
             created_at = None
@@ -135,33 +209,53 @@ def migrate_legacy_users():
                 except ValueError:
                     created_at = datetime.utcnow()
 
-            user = User(
-                username=username,
-                email=email,
-                password_hash=password_hash,
-                created_at=created_at or datetime.utcnow()
-            )
-            db.add(user)
-        db.commit()
+            rows.append({
+                'username': username,
+                'email': email,
+                'password_hash': password_hash,
+                'created_at': created_at or datetime.utcnow(),
+            })
+            taken_emails.add(email)
+            taken_usernames.add(username)
+
+        if rows:
+            conn.execute(insert(User), rows)
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_documents_user_uploaded')
+        # create_all does not add new columns to an existing table either
+        existing = {row[1] for row in conn.exec_driver_sql('PRAGMA table_info(documents)')}
+        for column in Document.__table__.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE documents ADD COLUMN {column.name} {column_type}')
+        # One-time backfill so the history list never has to decode stats_json
+        conn.exec_driver_sql(
+            "UPDATE documents SET simplified_word_count = "
+            "COALESCE(json_extract(stats_json, '$.simplified_metrics.word_count'), 0) "
+            "WHERE simplified_word_count IS NULL AND stats_json IS NOT NULL"
+        )
+    # create_all skips indexes on tables that already exist; columns must exist first
+    for index in Document.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     migrate_legacy_users()
 
 
 def calculate_reading_ease(text):
-    if not text or not text.strip():
+    stats = text if isinstance(text, TextStats) else TextStats.from_text(text)
+    if not stats.text.strip():
         return 0.0
 
     try:
-        sentences = sent_tokenize(text)
-        words = [word for word in word_tokenize(text) if word.isalpha()]
+        sentences, words = stats.sentences, stats.words
 
         if len(sentences) == 0 or len(words) == 0:
             return 0.0
 
-        syllable_count = sum(count_syllables(word) for word in words)
+        syllable_count = stats.syllable_count
         words_per_sentence = len(words) / max(len(sentences), 1)
         syllables_per_word = syllable_count / max(len(words), 1)
         score = 206.835 - (1.015 * words_per_sentence) - (84.6 * syllables_per_word)
@@ -174,13 +268,24 @@ def get_user_by_email(db, email):
     return db.query(User).filter(User.email == email).first()
 
 
-def get_user_by_username(db, username):
-    return db.query(User).filter(User.username == username).first()
+def _dump_payload(payload):
+    """Serialize a stored report; orjson when installed, otherwise the json module"""
+    if _HAS_ORJSON:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(payload)
+
 
+def _load_payload(raw):
+    if not raw:
+        return {}
+    if _HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
-def store_document_record(username, filename, raw_text, simplified_texts, results, original_metrics, simplified_metrics):
+
+def store_document_record(user_id, filename, raw_text, simplified_texts, results, original_metrics, simplified_metrics, original_stats=None, content_sha1=None):
     combined_simplified = " ".join(simplified_texts) if simplified_texts else ''
-    readability_score = calculate_reading_ease(raw_text)
+    readability_score = calculate_reading_ease(original_stats or raw_text)
 
     stats_payload = {
         'original_metrics': original_metrics,
@@ -193,21 +298,22 @@ def store_document_record(username, filename, raw_text, simplified_texts, result
     report_payload.pop('clause_type_chart', None)
     report_payload.pop('stats_chart', None)
 
-    with get_db() as db:
-        user = get_user_by_username(db, username)
-        if not user:
-            raise ValueError('User not found for document storage')
+    if not user_id:
+        raise ValueError('User not found for document storage')
 
+    with get_db() as db:
         document = Document(
-            user_id=user.id,
+            user_id=user_id,
             document_title=filename,
             original_text=raw_text,
             simplified_text_basic=combined_simplified,
             original_readability_score=readability_score,
-            report_json=json.dumps(report_payload),
-            stats_json=json.dumps(stats_payload),
+            report_json=_dump_payload(report_payload),
+            stats_json=_dump_payload(stats_payload),
             clause_count=results.get('clause_count', 0),
-            word_count=results.get('word_count', 0)
+            word_count=results.get('word_count', 0),
+            simplified_word_count=simplified_metrics.get('word_count', 0),
+            content_sha1=content_sha1
         )
 
         db.add(document)
@@ -216,34 +322,78 @@ def store_document_record(username, filename, raw_text, simplified_texts, result
         return document
 
 
-def load_document_history(user_id):
+def find_document_by_content(user_id, content_sha1):
     with get_db() as db:
-        docs = (
+        return (
             db.query(Document)
+            .filter(Document.user_id == user_id, Document.content_sha1 == content_sha1)
+            .order_by(Document.uploaded_at.desc())
+            .first()
+        )
+
+
+def _stream_sha1(stream, chunk_size=1024 * 1024):
+    """SHA-1 of an upload stream, read in chunks and rewound for the caller"""
+    digest = hashlib.sha1()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def load_document_history(user_id):
+    with get_db() as db:
+        # Scalar columns only: no Text blobs read, no JSON decoded, no ORM objects built
+        rows = (
+            db.query(
+                Document.id,
+                Document.document_title,
+                Document.uploaded_at,
+                Document.original_readability_score,
+                Document.clause_count,
+                Document.word_count,
+                Document.simplified_word_count,
+            )
             .filter(Document.user_id == user_id)
             .order_by(Document.uploaded_at.desc())
             .all()
         )
 
-        history = []
-        for doc in docs:
-            stats_payload = json.loads(doc.stats_json) if doc.stats_json else {}
-            history.append({
-                'id': doc.id,
-                'document_title': doc.document_title,
-                'uploaded_at': doc.uploaded_at.isoformat(),
-                'original_readability_score': doc.original_readability_score,
-                'clause_count': doc.clause_count,
-                'word_count': doc.word_count,
-                'simplified_word_count': stats_payload.get('simplified_metrics', {}).get('word_count', 0),
-            })
+        return [
+            {
+                'id': row.id,
+                'document_title': row.document_title,
+                'uploaded_at': row.uploaded_at.isoformat(),
+                'original_readability_score': row.original_readability_score,
+                'clause_count': row.clause_count,
+                'word_count': row.word_count,
+                'simplified_word_count': row.simplified_word_count or 0,
+            }
+            for row in rows
+        ]
+
+
+def _freeze(mapping):
+    return tuple(sorted(mapping.items())) if isinstance(mapping, dict) else ()
 
-        return history
+
+@lru_cache(maxsize=512)
+def _charts_for(clause_type_summary, original_metrics, simplified_metrics):
+    """Render a stored document's charts once; reports never change after upload"""
+    return (
+        generate_clause_type_chart(dict(clause_type_summary)),
+        generate_stats_chart(dict(original_metrics), dict(simplified_metrics)),
+    )
+
+
+# Renders charts for fresh uploads into the _charts_for cache after the response is sent
+_chart_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='clauseease-charts')
 
 
 def build_document_report(document):
-    report_payload = json.loads(document.report_json) if document.report_json else {}
-    stats_payload = json.loads(document.stats_json) if document.stats_json else {}
+    report_payload = _load_payload(document.report_json)
+    stats_payload = _load_payload(document.stats_json)
 
     if not report_payload:
         report_payload = {
@@ -270,14 +420,14 @@ def build_document_report(document):
     if 'clause_type_summary' not in report_payload:
         report_payload['clause_type_summary'] = stats_payload.get('clause_type_summary', {})
 
-    if 'clause_type_chart' not in report_payload:
-        report_payload['clause_type_chart'] = generate_clause_type_chart(report_payload.get('clause_type_summary', {}))
-
-    if 'stats_chart' not in report_payload:
-        report_payload['stats_chart'] = generate_stats_chart(
-            report_payload.get('original_readability', {}),
-            report_payload.get('simplified_readability', {})
+    if 'clause_type_chart' not in report_payload or 'stats_chart' not in report_payload:
+        clause_type_chart, stats_chart = _charts_for(
+            _freeze(report_payload.get('clause_type_summary', {})),
+            _freeze(report_payload.get('original_readability', {})),
+            _freeze(report_payload.get('simplified_readability', {})),
         )
+        report_payload.setdefault('clause_type_chart', clause_type_chart)
+        report_payload.setdefault('stats_chart', stats_chart)
 
     report_payload['document_id'] = document.id
     return report_payload
@@ -291,27 +441,72 @@ def remove_session(exception=None):
     SessionLocal.remove()
 
 # Helper functions
+
+# Passwords are stored as argon2id (Werkzeug pbkdf2 without argon2-cffi). Legacy
+# unsalted SHA-256 hex digests still verify and are upgraded on the next login.
+if _HAS_ARGON2:
+    _password_hasher = PasswordHasher(memory_cost=64 * 1024, parallelism=2)
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+def _is_legacy_sha256(password_hash):
+    return len(password_hash) == 64 and set(password_hash) <= _HEX_DIGITS
+
 def hash_password(password):
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password for storage"""
+    if _HAS_ARGON2:
+        return _password_hasher.hash(password)
+    return generate_password_hash(password)
+
+def verify_password(password_hash, password):
+    """Check a password against its stored hash in constant time"""
+    if _HAS_ARGON2 and password_hash.startswith('$argon2'):
+        try:
+            return _password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    if _is_legacy_sha256(password_hash):
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(password_hash, legacy_hash)
+    return check_password_hash(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    if _is_legacy_sha256(password_hash):
+        return True
+    if not _HAS_ARGON2:
+        return False
+    if not password_hash.startswith('$argon2'):
+        return True
+    return _password_hasher.check_needs_rehash(password_hash)
+
+# Verified against when the email is unknown so misses take as long as hits
+_DUMMY_PASSWORD_HASH = hash_password('clauseease-dummy-password')
+
+_MAX_TOKEN_BODY = 1024 * 1024
+
 
 def _extract_token_from_request():
     """Pull JWT from headers, cookies, query params, or payload."""
-    auth_header = request.headers.get('Authorization', '').strip()
+    headers = request.headers
+    auth_header = headers.get('Authorization', '').strip()
     if auth_header:
-        if auth_header.lower().startswith('bearer '):
+        if auth_header[:7].lower() == 'bearer ':
             return auth_header[7:].strip()
         return auth_header
 
-    for header_name in ('X-Access-Token', 'x-access-token'):
-        candidate = request.headers.get(header_name)
-        if candidate:
-            return candidate.strip()
+    # Werkzeug header lookups are case-insensitive, so one get covers every spelling
+    candidate = headers.get('X-Access-Token')
+    if candidate:
+        return candidate.strip()
 
+    cookies = request.cookies
     for cookie_name in ('token', 'Authorization', 'authorization'):
-        candidate = request.cookies.get(cookie_name)
+        candidate = cookies.get(cookie_name)
         if candidate:
-            return candidate.strip().removeprefix('Bearer ').strip()
+            candidate = candidate.strip()
+            if candidate.startswith('Bearer '):
+                candidate = candidate[7:].strip()
+            return candidate
 
     candidate = request.args.get('token')
     if candidate:
@@ -321,6 +516,9 @@ def _extract_token_from_request():
     if candidate:
         return candidate.strip()
 
+    # Only small JSON bodies are parsed for a token; uploads never reach here as JSON
+    if not request.is_json or (request.content_length or 0) > _MAX_TOKEN_BODY:
+        return None
     json_payload = request.get_json(silent=True) or {}
     candidate = json_payload.get('token') if isinstance(json_payload, dict) else None
     if candidate:
@@ -329,6 +527,12 @@ def _extract_token_from_request():
     return None
 
 
+# Token settings resolved once: the HMAC key as bytes and one reusable decoder
+_JWT_SECRET = app.config['SECRET_KEY'].encode('utf-8')
+_JWT_ALGORITHMS = ('HS256',)
+_JWT_DECODER = jwt.PyJWT(options={'require': ['exp'], 'verify_signature': True})
+
+
 def token_required(f):
     """Decorator to protect routes with JWT token"""
     @wraps(f)
@@ -337,23 +541,22 @@ def token_required(f):
             return '', 204
         token = _extract_token_from_request()
 
-        print(f"\n🔐 TOKEN CHECK")
-        print(f"Token present: {bool(token)}")
+        logger.debug("Token present: %s", bool(token))
 
         if not token:
-            print("❌ Token missing")
+            logger.debug("Token missing")
             return jsonify({'message': 'Token is missing'}), 401
 
         try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+            data = _JWT_DECODER.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
             current_user = {
                 'username': data.get('username'),
                 'email': data.get('email'),
                 'user_id': data.get('user_id')
             }
-            print(f"✅ Token valid for user: {current_user['username']}\n")
+            logger.debug("Token valid for user: %s", current_user['username'])
         except Exception as e:
-            print(f"❌ Token invalid: {str(e)}\n")
+            logger.info("Token invalid: %s", e)
             return jsonify({'message': 'Token is invalid'}), 401
 
         return f(current_user, *args, **kwargs)
@@ -369,7 +572,6 @@ def register():
     
     try:
         data = request.get_json()
-        print(f"[REGISTER] Received data: {data}")  # Debug logging
         
         username = data.get('username', '').strip()
         email = data.get('email', '').strip()
@@ -399,14 +601,14 @@ def register():
             db.add(user)
             db.commit()
 
-        print(f"[REGISTER] User {username} registered successfully")  # Debug logging
+        logger.info("User %s registered", username)
         return jsonify({
             'message': 'Registration successful',
             'username': username
         }), 201
         
     except Exception as e:
-        print(f"[REGISTER ERROR] {str(e)}")  # Debug logging
+        logger.exception("Registration failed")
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 @app.route('/api/login', methods=['POST', 'OPTIONS'])
@@ -421,8 +623,6 @@ def login():
         email = data.get('email', '').strip()
         password = data.get('password', '')
         
-        print(f"[LOGIN] Email: {email}, Password entered: {password}")  # Debug
-        
         if not email or not password:
             return jsonify({'message': 'Email and password required'}), 400
         
@@ -430,20 +630,18 @@ def login():
             user = get_user_by_email(db, email)
 
             if not user:
-                print(f"[LOGIN ERROR] Email {email} not found in database")  # Debug
+                verify_password(_DUMMY_PASSWORD_HASH, password)
+                logger.info("Login failed: unknown email %s", email)
                 return jsonify({'message': 'Invalid credentials'}), 401
 
-            input_hash = hash_password(password)
-            stored_hash = user.password_hash
-
-            print(f"[LOGIN DEBUG] Input hash: {input_hash}")  # Debug
-            print(f"[LOGIN DEBUG] Stored hash: {stored_hash}")  # Debug
-            print(f"[LOGIN DEBUG] Match: {input_hash == stored_hash}")  # Debug
-
-            if stored_hash != input_hash:
-                print(f"[LOGIN ERROR] Password mismatch for {email}")  # Debug
+            if not verify_password(user.password_hash, password):
+                logger.info("Login failed: password mismatch for %s", email)
                 return jsonify({'message': 'Invalid credentials'}), 401
 
+            if password_needs_rehash(user.password_hash):
+                user.password_hash = hash_password(password)
+                db.commit()
+
             user_id = user.id
             username = user.username
 
@@ -452,9 +650,9 @@ def login():
             'username': username,
             'email': email,
             'exp': datetime.utcnow() + timedelta(days=1)
-        }, app.config['SECRET_KEY'], algorithm='HS256')
+        }, _JWT_SECRET, algorithm=_JWT_ALGORITHMS[0])
         
-        print(f"[LOGIN] User {username} logged in successfully")  # Debug
+        logger.debug("User %s logged in", username)
         response = jsonify({
             'message': 'Login successful',
             'token': token,
@@ -480,7 +678,7 @@ def login():
         return response, 200
         
     except Exception as e:
-        print(f"[LOGIN ERROR] {str(e)}")  # Debug
+        logger.exception("Login failed")
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 @app.route('/api/process', methods=['POST', 'OPTIONS'])
@@ -489,36 +687,42 @@ def process_document(current_user):
     """Process uploaded document through all 5 modules"""
     if request.method == 'OPTIONS':
         return '', 204
-    print(f"\n{'='*60}")
-    print(f"📥 PROCESSING REQUEST RECEIVED")
-    user_name = current_user.get('username') if isinstance(current_user, dict) else str(current_user)
-    print(f"User: {user_name}")
-    print(f"Files in request: {list(request.files.keys())}")
-    print(f"{'='*60}\n")
+    logger.debug("Processing request from %s", current_user.get('username'))
     step = 'initial'
     if 'file' not in request.files:
-        print("❌ ERROR: No file in request.files")
+        logger.info("Process request without a file")
         return jsonify({'message': 'No file uploaded'}), 400
     
     file = request.files['file']
     
     if file.filename == '':
-        print("❌ ERROR: Empty filename")
+        logger.info("Process request with an empty filename")
         return jsonify({'message': 'No file selected'}), 400
     
-    print(f"✅ File received: {file.filename}")
+    logger.debug("File received: %s", file.filename)
     
-    temp_dir = ROOT / 'temp_uploads'
-    temp_dir.mkdir(exist_ok=True)
+    # The same bytes from the same user skip modules 1-5 and return the stored report
+    content_sha1 = _stream_sha1(file.stream)
+    existing = find_document_by_content(current_user.get('user_id'), content_sha1)
+    if existing is not None:
+        file.close()
+        logger.debug("Duplicate upload %s matches document %s", content_sha1, existing.id)
+        return jsonify(build_document_report(existing)), 200
     
-    temp_path = temp_dir / file.filename
-    file.save(str(temp_path))
+    # The upload was already written to disk while the form was parsed
+    temp_path = getattr(file.stream, 'name', None)
+    if not isinstance(temp_path, str):
+        # Content-addressed, unique name; the client filename only contributes its extension
+        suffix = Path(secure_filename(file.filename)).suffix.lower()
+        fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=f'{content_sha1}-', suffix=suffix)
+        os.close(fd)
+        file.save(temp_path)
     
     try:
         step = 'save_upload'
         # Module 1: Document Ingestion
         step = 'extract_text'
-        raw_text = extract_text(str(temp_path))
+        raw_text = extract_text(temp_path)
         
         if raw_text.startswith('[ERROR]'):
             return jsonify({'message': raw_text}), 400
@@ -529,14 +733,13 @@ def process_document(current_user):
         
         # Calculate readability metrics for original text
         step = 'calculate_original_metrics'
-        original_metrics = calculate_all_metrics(raw_text)
+        original_stats = TextStats.from_text(raw_text)
+        original_metrics = calculate_all_metrics(original_stats)
         
         # Module 3: Clause Detection
         step = 'detect_clause_type'
-        clause_types = []
-        for clause in clauses:
-            clause_type = detect_clause_type(clause['cleaned_text'])
-            clause_types.append(clause_type)
+        clause_texts = [clause['cleaned_text'] for clause in clauses]
+        clause_types = detect_clause_types_batch(clause_texts)
         
         # Module 4: Legal Terms Extraction
         step = 'extract_legal_terms'
@@ -544,15 +747,12 @@ def process_document(current_user):
         
         # Module 5: Language Simplification
         step = 'simplify_text'
-        simplified_texts = []
-        for clause in clauses:
-            simplified = simplify_text(clause['cleaned_text'])
-            simplified_texts.append(simplified)
+        simplified_texts = simplify_texts(clause_texts)
         
         # Combine all simplified text
         step = 'simplified_metrics'
         combined_simplified = " ".join(simplified_texts)
-        simplified_metrics = calculate_all_metrics(combined_simplified)
+        simplified_metrics = calculate_all_metrics(TextStats.from_text(combined_simplified))
         
         # Save session
         step = 'save_session'
@@ -585,33 +785,33 @@ def process_document(current_user):
                 }
                 for t in legal_terms
             ],
-            'clause_type_summary': {}
+            'clause_type_summary': dict(Counter(clause_types))
         }
         
-        from collections import Counter
-        type_counts = Counter(clause_types)
-        results['clause_type_summary'] = dict(type_counts)
-        
-        document_record = store_document_record(user_name, file.filename, raw_text, simplified_texts, results, original_metrics, simplified_metrics)
+        document_record = store_document_record(current_user.get('user_id'), file.filename, raw_text, simplified_texts, results, original_metrics, simplified_metrics, original_stats, content_sha1)
         results['document_id'] = document_record.id
         
-        # Generate charts using matplotlib/seaborn
+        # Charts render off the request thread; GET /api/history/<id> serves them
         step = 'generate_charts'
-        results['clause_type_chart'] = generate_clause_type_chart(results['clause_type_summary'])
-        results['stats_chart'] = generate_stats_chart(original_metrics, simplified_metrics)
+        _chart_pool.submit(
+            _charts_for,
+            _freeze(results['clause_type_summary']),
+            _freeze(original_metrics),
+            _freeze(simplified_metrics),
+        )
+        results['charts_pending'] = True
         
         return jsonify(results), 200
         
     except Exception as e:
-        import traceback
         error_message = f"Processing error at {step}: {str(e)}"
-        print(error_message)
-        print(traceback.format_exc())
+        logger.exception("Processing error at %s", step)
         return jsonify({'message': error_message}), 500
     
     finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        file.close()
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -622,16 +822,11 @@ def health_check():
 @app.route('/api/history', methods=['GET'])
 @token_required
 def get_history(current_user):
-    username = current_user.get('username') if isinstance(current_user, dict) else None
-    if not username:
+    # The signed token already carries the user id; no lookup by username
+    user_id = current_user.get('user_id') if isinstance(current_user, dict) else None
+    if not user_id:
         return jsonify({'history': []}), 200
 
-    with get_db() as db:
-        user = get_user_by_username(db, username)
-        if not user:
-            return jsonify({'history': []}), 200
-        user_id = user.id
-
     history = load_document_history(user_id)
     return jsonify({'history': history}), 200
 
@@ -639,16 +834,12 @@ def get_history(current_user):
 @app.route('/api/history/<int:document_id>', methods=['GET'])
 @token_required
 def get_document(current_user, document_id):
-    username = current_user.get('username') if isinstance(current_user, dict) else None
-    if not username:
+    user_id = current_user.get('user_id') if isinstance(current_user, dict) else None
+    if not user_id:
         return jsonify({'message': 'Unauthorized'}), 401
 
     with get_db() as db:
-        user = get_user_by_username(db, username)
-        if not user:
-            return jsonify({'message': 'Unauthorized'}), 401
-
-        document = db.query(Document).filter(Document.id == document_id, Document.user_id == user.id).first()
+        document = db.query(Document).filter(Document.id == document_id, Document.user_id == user_id).first()
         if not document:
             return jsonify({'message': 'Document not found'}), 404
 
@@ -659,16 +850,12 @@ def get_document(current_user, document_id):
 @app.route('/api/history/<int:document_id>/download', methods=['GET'])
 @token_required
 def download_document(current_user, document_id):
-    username = current_user.get('username') if isinstance(current_user, dict) else None
-    if not username:
+    user_id = current_user.get('user_id') if isinstance(current_user, dict) else None
+    if not user_id:
         return jsonify({'message': 'Unauthorized'}), 401
 
     with get_db() as db:
-        user = get_user_by_username(db, username)
-        if not user:
-            return jsonify({'message': 'Unauthorized'}), 401
-
-        document = db.query(Document).filter(Document.id == document_id, Document.user_id == user.id).first()
+        document = db.query(Document).filter(Document.id == document_id, Document.user_id == user_id).first()
         if not document:
             return jsonify({'message': 'Document not found'}), 404
 
@@ -0,0 +1,151 @@
+// Admin dashboard charts drawn on <canvas> directly; no third-party script runs on this page
+document.addEventListener('DOMContentLoaded', () => {
+    if (typeof adminChartData === 'undefined') {
+        return;
+    }
+    const charts = [
+        () => drawRegistrationsChart(adminChartData.registrations),
+        () => drawDocumentsChart(adminChartData.documents)
+    ];
+    const redraw = () => charts.forEach(draw => draw());
+    redraw();
+
+    let resizeTimer = null;
+    window.addEventListener('resize', () => {
+        clearTimeout(resizeTimer);
+        resizeTimer = setTimeout(redraw, 100);
+    });
+});
+
+const CHART_PADDING = { top: 20, right: 20, bottom: 40, left: 56 };
+const CHART_FONT = '12px system-ui, -apple-system, "Segoe UI", sans-serif';
+const GRID_COLOR = 'rgba(148, 163, 184, 0.35)';
+const TEXT_COLOR = '#475569';
+
+function prepareCanvas(canvas) {
+    // Fill the card and render at device resolution so lines stay crisp
+    const parent = canvas.parentElement;
+    const width = parent.clientWidth;
+    const height = parent.clientHeight || Math.round(width * 9 / 16);
+    const ratio = window.devicePixelRatio || 1;
+    canvas.style.width = `${width}px`;
+    canvas.style.height = `${height}px`;
+    canvas.width = Math.round(width * ratio);
+    canvas.height = Math.round(height * ratio);
+
+    const ctx = canvas.getContext('2d');
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, width, height);
+    ctx.font = CHART_FONT;
+    return { ctx, width, height };
+}
+
+function niceStep(maxValue) {
+    // Whole-number tick step giving at most ~5 gridlines
+    const raw = Math.max(maxValue, 1) / 5;
+    const magnitude = Math.pow(10, Math.floor(Math.log10(raw)));
+    const step = [1, 2, 5, 10].map(m => m * magnitude).find(s => s >= raw);
+    return Math.max(1, Math.ceil(step));
+}
+
+function drawAxes(ctx, plot, labels, maxValue) {
+    const step = niceStep(maxValue);
+    const top = Math.max(step, Math.ceil(maxValue / step) * step);
+
+    ctx.fillStyle = TEXT_COLOR;
+    ctx.strokeStyle = GRID_COLOR;
+    ctx.lineWidth = 1;
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    for (let value = 0; value <= top; value += step) {
+        const y = plot.y + plot.height - (value / top) * plot.height;
+        ctx.beginPath();
+        ctx.moveTo(plot.x, y);
+        ctx.lineTo(plot.x + plot.width, y);
+        ctx.stroke();
+        ctx.fillText(String(value), plot.x - 8, y);
+    }
+
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    const slot = plot.width / labels.length;
+    labels.forEach((label, index) => {
+        ctx.fillText(label, plot.x + slot * (index + 0.5), plot.y + plot.height + 10);
+    });
+
+    // Rotated y-axis title, as the previous chart options showed it
+    ctx.save();
+    ctx.font = `bold ${CHART_FONT}`;
+    ctx.translate(14, plot.y + plot.height / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.textBaseline = 'middle';
+    ctx.fillText('Count', 0, 0);
+    ctx.restore();
+
+    return { top, slot };
+}
+
+function plotArea(width, height) {
+    return {
+        x: CHART_PADDING.left,
+        y: CHART_PADDING.top,
+        width: Math.max(width - CHART_PADDING.left - CHART_PADDING.right, 1),
+        height: Math.max(height - CHART_PADDING.top - CHART_PADDING.bottom, 1)
+    };
+}
+
+function drawRegistrationsChart(series) {
+    const canvas = document.getElementById('registrations-chart');
+    if (!canvas || !series || !series.values.length) return;
+
+    const { ctx, width, height } = prepareCanvas(canvas);
+    const plot = plotArea(width, height);
+    const { top, slot } = drawAxes(ctx, plot, series.labels, Math.max(...series.values));
+    const points = series.values.map((value, index) => [
+        plot.x + slot * (index + 0.5),
+        plot.y + plot.height - (value / top) * plot.height
+    ]);
+
+    ctx.strokeStyle = '#2563EB';
+    ctx.fillStyle = '#2563EB';
+    ctx.lineWidth = 2;
+    ctx.beginPath();
+    points.forEach(([x, y], index) => (index ? ctx.lineTo(x, y) : ctx.moveTo(x, y)));
+    ctx.stroke();
+    points.forEach(([x, y]) => {
+        ctx.beginPath();
+        ctx.arc(x, y, 4, 0, Math.PI * 2);
+        ctx.fill();
+    });
+}
+
+function drawDocumentsChart(series) {
+    const canvas = document.getElementById('documents-chart');
+    if (!canvas || !series || !series.values.length) return;
+
+    const { ctx, width, height } = prepareCanvas(canvas);
+    const plot = plotArea(width, height);
+    const { top, slot } = drawAxes(ctx, plot, series.labels, Math.max(...series.values));
+
+    // Light-to-dark blue ramp, matching the previous server-rendered palette
+    const count = series.values.length;
+    const barWidth = slot * 0.6;
+    series.values.forEach((value, index) => {
+        const lightness = count > 1 ? 75 - (index * 40) / (count - 1) : 55;
+        const barHeight = (value / top) * plot.height;
+        const x = plot.x + slot * index + (slot - barWidth) / 2;
+        const y = plot.y + plot.height - barHeight;
+        const radius = Math.min(6, barWidth / 2, barHeight);
+
+        ctx.fillStyle = `hsl(217, 80%, ${lightness}%)`;
+        ctx.beginPath();
+        ctx.moveTo(x, y + barHeight);
+        ctx.lineTo(x, y + radius);
+        ctx.arcTo(x, y, x + radius, y, radius);
+        ctx.lineTo(x + barWidth - radius, y);
+        ctx.arcTo(x + barWidth, y, x + barWidth, y + radius, radius);
+        ctx.lineTo(x + barWidth, y + barHeight);
+        ctx.closePath();
+        ctx.fill();
+    });
+}